@@ -1,33 +1,123 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Header, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
-from pydantic import BaseModel
-from pathlib import Path
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field, ValidationError
 from datetime import datetime, timezone
-from contextlib import asynccontextmanager
-
-from models import Generator, nz
-from database import get_db, init_db, GeneratedCard
+from typing import Optional
+from contextlib import asynccontextmanager, suppress
+
+from database import get_db, init_db, prewarm_pool, GeneratedCard, SessionLocal
+from warmup import timed, warm_up_models
+from similarity import LatentIndex, build_index, latent_to_bytes
+from gallery_io import iter_ndjson, read_ndjson, import_batch, finish_import, DuplicateCardIds, BATCH_SIZE
+from ranking import hot_decay_loop, SHARE_SCORE, VOTE_SCORE
+from ratelimit import RateLimitMiddleware, limits_from_env, query_params, store_from_env, rate_limiting_enabled, api_keys_from_env, trusted_proxy_hops_from_env
+from rarity import get_random_rarity
+from caching import make_etag, etag_matches, cache_headers, not_modified, GALLERY_CACHE_CONTROL, CARD_IMAGE_CACHE_CONTROL, NO_STORE, seeded_cache_control
+from autotune import autotune_enabled, tune_or_load, default_settings, apply_settings
+from quality import best_of_n, QualityMetrics, QUALITY_DEFAULT_K, QUALITY_MAX_K
+from registry import ModelRegistry, ModelNotFound
+from writequeue import WriteQueue, write_queue_enabled, run_job
+from render import CardRenderer
+from ingest import ShareRequest, InvalidImage, PayloadTooLarge, read_capped_body, canonicalize_card_image
+from inference import seed_latent, interpolate_latents, tensors_to_images, image_to_base64, encode_animation
 import torch
+import asyncio
 import random
-
-import io
 import base64
-from PIL import Image
+import binascii
+import math
+import secrets
+import time
+
+from functools import lru_cache
 import os
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    global inference_settings
+    startup = time.perf_counter()
+    warmup_report = {}
+
     # Startup: Initialize database
-    init_db()
-    print("Backend ready")
+    _, warmup_report["init_db_ms"] = await asyncio.to_thread(timed, init_db)
+
+    default_model, warmup_report["model_load_ms"] = await asyncio.to_thread(timed, model_registry.get)
+    print(f"Generator loaded! ({default_model.name})")
+    if default_model.netD is None:
+        print("No discriminator in checkpoint, quality mode disabled")
+
+    # Optional: benchmark netG on this host and keep the best thread count / batch size / memory format
+    if autotune_enabled():
+        inference_settings, warmup_report["autotune_ms"] = await asyncio.to_thread(timed, tune_or_load, default_model.netG, device)
+        print(f"Inference settings ({inference_settings['source']}): "
+              f"{inference_settings['num_threads']} threads, batch {inference_settings['batch_size']}, "
+              f"{inference_settings['memory_format']}")
+        # Seed-only gallery cards are the batched serving path, render them at the tuned batch size
+        card_renderer.batch_size = inference_settings["batch_size"]
+
+    _, warmup_report["similarity_index_ms"] = await asyncio.to_thread(timed, rebuild_similarity_index)
+
+    # Warm-up: dummy passes at every batch size we serve, and a full DB connection pool
+    batch_sizes = [1, inference_settings["batch_size"], QUALITY_DEFAULT_K, DEFAULT_EVOLUTION_FRAMES]
+    if os.getenv("WARMUP_BATCH_SIZES"):
+        batch_sizes = [int(size) for size in os.getenv("WARMUP_BATCH_SIZES").split(",")]
+    warmup_report["model_warmup_ms"] = await asyncio.to_thread(warm_up_models, default_model.netG, default_model.netD, batch_sizes, device)
+    warmup_report["db_connections"], warmup_report["db_pool_ms"] = await asyncio.to_thread(timed, prewarm_pool)
+    warmup_report["total_ms"] = round((time.perf_counter() - startup) * 1000, 2)
+
+    decay_task = asyncio.create_task(hot_decay_loop())
+    if write_queue:
+        write_queue.start()
+    readiness.update(ready=True, warmup=warmup_report)
+    print(f"Backend ready (warm-up took {warmup_report['total_ms']} ms)")
     yield
-    # TODO: possible cleanup needed 
+    # Shutdown: fail readiness first so load balancers stop routing here, then stop background jobs
+    readiness["ready"] = False
+    decay_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await decay_task
+    if write_queue:
+        # Drain queued shares/votes before exiting
+        await asyncio.to_thread(write_queue.stop)
+        print(f"Write queue stopped: {write_queue.stats()}")
 
 
 app = FastAPI(lifespan=lifespan)
+
+# Batched generation pays one `generate` token per IMAGES_PER_TOKEN candidates or frames it renders
+IMAGES_PER_TOKEN = int(os.getenv("RATE_LIMIT_IMAGES_PER_TOKEN", "8"))
+
+
+def generation_cost(scope):
+    """Tokens a /api/card/ request takes from the generate bucket"""
+    params = query_params(scope)
+    if scope["path"] == "/api/card/evolve":
+        param, default = "frames", DEFAULT_EVOLUTION_FRAMES
+    elif scope["path"] == "/api/card/best" or params.get("quality") == "best":
+        param, default = "k", QUALITY_DEFAULT_K
+    else:
+        return 1
+    images = params.get(param, "")
+    images = int(images) if images.isdigit() else default
+    return max(1, math.ceil(images / IMAGES_PER_TOKEN))
+
+
+# Per-client token buckets in front of netG and gallery writes (added first so CORS wraps the 429s)
+app.add_middleware(
+    RateLimitMiddleware,
+    limits=limits_from_env(generate_cost=generation_cost),
+    store=store_from_env(),
+    enabled=rate_limiting_enabled(),
+    api_keys=api_keys_from_env(),
+    trusted_proxy_hops=trusted_proxy_hops_from_env(),
+)
+
 ALLOWED_ORIGINS = os.getenv("FRONTEND_URL", "http://localhost:5500,http://127.0.0.1:5500").split(",")
 
 app.add_middleware(
@@ -41,82 +131,338 @@ app.add_middleware(
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 print(f"Using device: {device}")
 
-CKPT_PATH = Path("checkpoints/gan_checkpoint.pth")
-netG = Generator(ngpu=1 if torch.cuda.is_available() else 0).to(device)
+def prepare_model(model):
+    """New checkpoints get the same memory format as the (possibly autotuned) default"""
+    apply_settings(model.netG, inference_settings)
+
 
-checkpoint = torch.load(CKPT_PATH, map_location=device)
-netG.load_state_dict(checkpoint['generator_state_dict'])
-netG.eval()
-print("Generator loaded!")
+# Checkpoints in CHECKPOINT_DIR by name (file stem), LRU-cached within MODEL_MEMORY_BUDGET_MB.
+# The default is loaded (and warmed up) in lifespan, before the app reports ready.
+# A model's name is part of every seeded ETag: same seed + same checkpoint = same image.
+model_registry = ModelRegistry(device, on_load=prepare_model)
+# Seed-only gallery cards are rendered on read, batched per page and LRU-cached
+card_renderer = CardRenderer(model_registry)
+# Share/vote writes are grouped into shared transactions by one writer thread (default on SQLite)
+write_queue = WriteQueue() if write_queue_enabled() else None
+readiness = {"ready": False, "warmup": None}
 
-# Weighted Rarity Selection:
-# Common: 70%, Uncommon: 15%, Rare: 8%, Epic: 6%, Legendary: 1%
-def get_random_rarity():
-    rand = random.random() * 100
-    if rand < 70: return 'Common'
-    elif rand < 85: return 'Uncommon'
-    elif rand < 93: return 'Rare'
-    elif rand < 99: return 'Epic'
-    else: return 'Legendary'
+# Largest seed the frontend can round-trip exactly (JS Number.MAX_SAFE_INTEGER)
+MAX_SEED = 2**53 - 1
+
+# Replaced by the autotuner at startup when AUTOTUNE is enabled
+inference_settings = default_settings()
+
+# Cost of discriminator-scored generation, reported at /api/inference/quality
+quality_metrics = QualityMetrics()
+
+# Latents of every shared card that came from our generator, for "more like this"
+similarity_index = LatentIndex()
+
+
+def rebuild_similarity_index():
+    """Build a fresh index from the DB, then swap it in so readers never see a partial one"""
+    global similarity_index
+    index = LatentIndex()
+    db = SessionLocal()
+    try:
+        count = build_index(index, db)
+    finally:
+        db.close()
+    similarity_index = index
+    print(f"Similarity index built with {count} cards")
 
 @app.get("/")
 def root():
     return {"status": "online"}
 
+
+@app.get("/health/live")
+def liveness():
+    """The process is up (says nothing about whether it can serve yet)"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+def readiness_probe(response: Response):
+    """Ready once the model is loaded and warmed and the DB pool is open, with warm-up timings"""
+    if not readiness["ready"]:
+        response.status_code = 503
+        return {"status": "warming_up", "warmup": readiness["warmup"]}
+    return {"status": "ready", "warmup": readiness["warmup"]}
+
+@app.get("/api/inference/config")
+def get_inference_config():
+    """Inference settings in use (autotuned, cached or torch defaults)"""
+    return {key: value for key, value in inference_settings.items() if key != "results"}
+
+
+def get_model(name: Optional[str] = None, version: Optional[str] = None):
+    """Resolve the `model=` selector (default model when omitted), pinned to a checkpoint sha256 with `version=`"""
+    try:
+        if version is not None:
+            return model_registry.get_version(name, version)
+        return model_registry.get(name)
+    except ModelNotFound:
+        if version is not None:
+            raise HTTPException(status_code=404, detail=f"Model '{name}' with version '{version}' not found")
+        raise HTTPException(status_code=404, detail=f"Model '{name}' not found")
+
+
+@app.get("/api/models")
+def list_models():
+    """Available checkpoints, the ones in memory and the current default"""
+    return model_registry.status()
+
+
+@app.get("/api/inference/quality")
+def get_quality_metrics():
+    """Quality mode configuration and running cost metrics"""
+    return {
+        "enabled": get_model().netD is not None,
+        "default_k": QUALITY_DEFAULT_K,
+        "max_k": QUALITY_MAX_K,
+        **quality_metrics.snapshot()
+    }
+
+
+def generate_best_cards(k: Optional[int], count: int, model_name: Optional[str] = None):
+    """Oversample k seeds and keep the `count` cards the discriminator likes best"""
+    model = get_model(model_name)
+    if model.netD is None:
+        raise HTTPException(status_code=503, detail="Quality mode unavailable: checkpoint has no discriminator")
+
+    if k is None:
+        k = QUALITY_DEFAULT_K
+    if not 1 <= k <= QUALITY_MAX_K:
+        raise HTTPException(status_code=400, detail=f"k must be between 1 and {QUALITY_MAX_K}")
+    if not 1 <= count <= k:
+        raise HTTPException(status_code=400, detail="count must be between 1 and k")
+
+    seeds = [random.randint(0, MAX_SEED) for _ in range(k)]
+    # Batched netG work shares the gallery renderer's concurrency bound
+    with card_renderer.render_slots:
+        best, generator_ms, discriminator_ms = best_of_n(model.netG, model.netD, seeds, count, device)
+    quality_metrics.record(k, [score for _, _, score in best], generator_ms, discriminator_ms)
+
+    return [
+        {
+            "image": f"data:image/png;base64,{image_to_base64(tensors_to_images(image)[0])}",
+            "rarity": get_random_rarity(random.Random(seed)),
+            "seed": seed,
+            "model": model.name,
+            "score": score
+        }
+        for seed, image, score in best
+    ]
+
+
+@app.get("/api/card/best")
+def generate_best(response: Response, k: Optional[int] = None, count: int = 1, model: Optional[str] = None):
+    """Top `count` of `k` candidates, scored by the discriminator in one batch"""
+    response.headers["Cache-Control"] = NO_STORE
+    return {"cards": generate_best_cards(k, count, model), "candidates": QUALITY_DEFAULT_K if k is None else k}
+
+
 @app.get("/api/card/generate")
-def generate_card():
-    # Generate random noise and run through generator
-    with torch.no_grad():
-        noise = torch.randn(1, nz, 1, 1, device=device)
-        fake_image = netG(noise)
+def generate_card(request: Request, response: Response, seed: Optional[int] = None, quality: str = "standard", k: Optional[int] = None, model: Optional[str] = None, version: Optional[str] = None):
+    """Generate a card, reproducibly when a seed is given"""
+
+    if seed is not None and not 0 <= seed <= MAX_SEED:
+        raise HTTPException(status_code=400, detail=f"seed must be between 0 and {MAX_SEED}")
+
+    if quality not in ["standard", "best"]:
+        raise HTTPException(status_code=400, detail="quality must be 'standard' or 'best'")
 
-    # Denormalize from [-1, 1] to [0, 1]
-    img_tensor = (fake_image[0] + 1) / 2
-    img_tensor = img_tensor.clamp(0, 1)
+    if quality == "best":
+        # The winning seed is returned, so the card can still be regenerated with ?seed=
+        if seed is not None:
+            raise HTTPException(status_code=400, detail="seed can't be combined with quality=best")
+        response.headers["Cache-Control"] = NO_STORE
+        return generate_best_cards(k, 1, model)[0]
 
-    # Convert to PIL Image
-    img_np = (img_tensor.permute(1, 2, 0).cpu().numpy() * 255).astype('uint8')
-    img = Image.fromarray(img_np)
+    # Hold on to this model object for the whole request, even if the default is swapped meanwhile
+    generator = get_model(model, version)
 
-    # Convert to base64
-    buffered = io.BytesIO()
-    img.save(buffered, format="PNG")
-    img_base64 = base64.b64encode(buffered.getvalue()).decode()
+    if seed is None:
+        # Fresh random card: still pick a seed so the card can be regenerated later
+        seed = random.randint(0, MAX_SEED)
+        response.headers["Cache-Control"] = NO_STORE
+    else:
+        etag = make_etag("card", generator.name, generator.version, seed)
+        cache_control = seeded_cache_control(version is not None)
+        if etag_matches(request, etag):
+            return not_modified(etag, cache_control)
+        response.headers.update(cache_headers(etag, cache_control))
+
+    # Run the seed's latent vector through the generator
+    with torch.no_grad():
+        fake_image = generator.netG(seed_latent(seed, device))
+
+    # Denormalize and convert to base64 PNG
+    img = tensors_to_images(fake_image)[0]
+    img_base64 = image_to_base64(img)
 
     return {
         "image": f"data:image/png;base64,{img_base64}",
-        "rarity": get_random_rarity()
+        "rarity": get_random_rarity(random.Random(seed)),
+        "seed": seed,
+        "model": generator.name,
+        # Pass back as ?version= for a URL that is cacheable for a day
+        "version": generator.version
     }
 
+
+MAX_EVOLUTION_FRAMES = 60
+DEFAULT_EVOLUTION_FRAMES = 24
+EVOLUTION_FORMATS = {"webp": "image/webp", "gif": "image/gif"}
+
+
+@lru_cache(maxsize=128)
+def render_evolution(model_name: str, version: str, seed_a: int, seed_b: int, frames: int, mode: str, format: str) -> bytes:
+    """Render the latent walk from seed_a to seed_b as one animated image"""
+    start = seed_latent(seed_a, device)
+    end = seed_latent(seed_b, device)
+    path = interpolate_latents(start, end, frames, mode)
+
+    # Every frame goes through netG in a single batched forward pass, and encoding is just as heavy,
+    # so both share the gallery renderer's concurrency bound
+    with card_renderer.render_slots:
+        with torch.no_grad():
+            fake_images = model_registry.get_version(model_name, version).netG(path)
+        return encode_animation(tensors_to_images(fake_images), format)
+
+
+@app.get("/api/card/evolve")
+def evolve_card(request: Request, seed_a: int, seed_b: int, frames: int = DEFAULT_EVOLUTION_FRAMES, mode: str = "linear", format: str = "webp", model: Optional[str] = None, version: Optional[str] = None):
+    """Animated "evolution" card interpolating between two seeded cards"""
+
+    if not 0 <= seed_a <= MAX_SEED or not 0 <= seed_b <= MAX_SEED:
+        raise HTTPException(status_code=400, detail=f"seeds must be between 0 and {MAX_SEED}")
+
+    if mode not in ["linear", "slerp"]:
+        raise HTTPException(status_code=400, detail="mode must be 'linear' or 'slerp'")
+
+    if format not in EVOLUTION_FORMATS:
+        raise HTTPException(status_code=400, detail="format must be 'webp' or 'gif'")
+
+    if frames < 2 or frames > MAX_EVOLUTION_FRAMES:
+        raise HTTPException(status_code=400, detail=f"frames must be between 2 and {MAX_EVOLUTION_FRAMES}")
+
+    generator = get_model(model, version)
+    etag = make_etag("evolve", generator.name, generator.version, seed_a, seed_b, frames, mode, format)
+    cache_control = seeded_cache_control(version is not None)
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+
+    content = render_evolution(generator.name, generator.version, seed_a, seed_b, frames, mode, format)
+    return Response(content=content, media_type=EVOLUTION_FORMATS[format],
+                    headers=cache_headers(etag, cache_control))
+
+
+async def read_share_request(request: Request) -> ShareRequest:
+    """Parse the share body, refusing to buffer more than SHARE_MAX_BYTES of it"""
+    try:
+        body = await read_capped_body(request)
+    except PayloadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    try:
+        return ShareRequest.model_validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+
+async def run_write(job):
+    """Run a write job (fn(db) -> result) on the batching writer, or in its own transaction"""
+    if write_queue:
+        return await write_queue.run(job)
+    return await run_in_threadpool(run_job, job)
+
+
 @app.post("/api/gallery/share")
-def share_card(request: dict, db: Session = Depends(get_db)):
+async def share_card(request: ShareRequest = Depends(read_share_request)):
     """Save a generated card to the public gallery"""
     
-    card = GeneratedCard(
-        image_data=request["image_data"],
-        upvotes=0,
-        created_at=datetime.now()
-    )
-
-    db.add(card)
-    db.commit()
-    db.refresh(card)
+    seed = request.seed
+    if seed is None and request.image_data is None:
+        raise HTTPException(status_code=400, detail="image_data or seed is required")
+    if seed is not None and not 0 <= seed <= MAX_SEED:
+        raise HTTPException(status_code=400, detail=f"seed must be between 0 and {MAX_SEED}")
+
+    def prepare():
+        if seed is None:
+            # Only 64x96 RGB images are stored, always as an optimized PNG whatever the client sent
+            return None, None, canonicalize_card_image(request.image_data)
+        # Cards from our generator are stored as (seed, model) plus the latent for similarity search,
+        # any uploaded image is redundant
+        return get_model(request.model), seed_latent(seed), None
+
+    try:
+        model, latent, image_data = await run_in_threadpool(prepare)
+    except InvalidImage as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def insert_card(db):
+        card = GeneratedCard(
+            image_data=image_data,
+            upvotes=0,
+            hot_score=SHARE_SCORE,
+            latent=latent_to_bytes(latent) if latent is not None else None,
+            seed=seed,
+            model=model.name if model else None,
+            model_version=model.version if model else None,
+            created_at=datetime.now()
+        )
+        db.add(card)
+        db.flush()
+        return card.id, card.created_at
+
+    card_id, created_at = await run_write(insert_card)
+
+    if latent is not None:
+        similarity_index.add(card_id, latent.flatten().numpy())
+    if image_data is None:
+        # Also warms the render cache for the gallery
+        image_data = await run_in_threadpool(card_renderer.render, model.name, model.version, seed)
 
     return {
-        "id": card.id,
-        "image": f"data:image/png;base64,{card.image_data}",
-        "upvotes": card.upvotes,
-        "created_at": card.created_at,
+        "id": card_id,
+        "image": f"data:image/png;base64,{image_data}",
+        "upvotes": 0,
+        "created_at": created_at,
         "message": "Card shared to gallery successfully!"
     }
 
 
+def card_images(db: Session, card_ids):
+    """{id: base64 PNG} for a page of cards, rendering seed-only cards in one batched pass"""
+    rows = (
+        db.query(GeneratedCard.id, GeneratedCard.image_data, GeneratedCard.seed, GeneratedCard.model,
+                 GeneratedCard.model_version)
+        .filter(GeneratedCard.id.in_(card_ids))
+        .all()
+    )
+    images = {row.id: row.image_data for row in rows if row.image_data is not None}
+    to_render = {
+        row.id: (row.model, row.model_version, row.seed)
+        for row in rows if row.image_data is None and row.seed is not None
+    }
+    if to_render:
+        rendered = card_renderer.render_many(to_render.values())
+        images.update({card_id: rendered[key] for card_id, key in to_render.items() if key in rendered})
+    return images
+
+
+def data_uri(image_data):
+    # None when a seed-only card's checkpoint is no longer available
+    return f"data:image/png;base64,{image_data}" if image_data is not None else None
+
+
 @app.get("/api/gallery")
-def get_gallery(sort_by: str = "popular", page: int = 1, limit: int = 50, db: Session = Depends(get_db)):
+def get_gallery(request: Request, response: Response, sort_by: str = "popular", page: int = 1, limit: int = 50, db: Session = Depends(get_db)):
     """Get paginated gallery of all shared cards"""
 
-    if sort_by not in ["popular", "recent"]:
-        raise HTTPException(status_code=400, detail="sort_by must be 'popular' or 'recent'")
+    if sort_by not in ["popular", "recent", "hot"]:
+        raise HTTPException(status_code=400, detail="sort_by must be 'popular', 'recent' or 'hot'")
 
     if limit > 100:
         limit = 100
@@ -125,53 +471,235 @@ def get_gallery(sort_by: str = "popular", page: int = 1, limit: int = 50, db: Se
 
     if sort_by == "popular":
         query = query.order_by(desc(GeneratedCard.upvotes), desc(GeneratedCard.created_at))
+    elif sort_by == "hot":
+        # Served straight from idx_hot_score_desc
+        query = query.order_by(desc(GeneratedCard.hot_score), desc(GeneratedCard.id))
     else:
         query = query.order_by(desc(GeneratedCard.created_at))
 
     total = query.count()
     offset = (page - 1) * limit
-    cards = query.offset(offset).limit(limit).all()
+
+    # Validate against the page's (id, upvotes) first, without loading any image data
+    page_rows = query.with_entities(GeneratedCard.id, GeneratedCard.upvotes, GeneratedCard.created_at).offset(offset).limit(limit).all()
+    etag = make_etag("gallery", sort_by, page, limit, total, [(row.id, row.upvotes) for row in page_rows])
+    if etag_matches(request, etag):
+        return not_modified(etag, GALLERY_CACHE_CONTROL)
+    response.headers.update(cache_headers(etag, GALLERY_CACHE_CONTROL))
+
+    images = card_images(db, [row.id for row in page_rows])
 
     return {
         "cards": [
             {
-                "id": card.id,
-                "image": f"data:image/png;base64,{card.image_data}",
-                "upvotes": card.upvotes,
-                "created_at": card.created_at
+                "id": row.id,
+                "image": data_uri(images.get(row.id)),
+                "upvotes": row.upvotes,
+                "created_at": row.created_at
             }
-            for card in cards
+            for row in page_rows
         ],
         "total": total,
         "has_more": (page * limit) < total
     }
 
 
+@app.get("/api/gallery/{card_id}/image")
+def get_card_image(card_id: int, request: Request, db: Session = Depends(get_db)):
+    """Raw PNG for one shared card, for <img> tags and CDNs"""
+    row = (
+        db.query(GeneratedCard.id, GeneratedCard.created_at, GeneratedCard.model_version)
+        .filter(GeneratedCard.id == card_id)
+        .first()
+    )
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Card not found")
+
+    # Shared images never change (seed-only cards only ever render with their recorded checkpoint),
+    # and votes don't touch this validator
+    etag = make_etag("card-image", row.id, row.created_at, row.model_version)
+    if etag_matches(request, etag):
+        return not_modified(etag, CARD_IMAGE_CACHE_CONTROL)
+
+    image_data = card_images(db, [card_id]).get(card_id)
+    try:
+        # Rows from before share/import validation can hold anything
+        png = base64.b64decode(image_data, validate=True) if image_data is not None else None
+    except binascii.Error:
+        png = None
+    if png is None:
+        raise HTTPException(status_code=404, detail="Card image unavailable")
+    return Response(content=png, media_type="image/png",
+                    headers=cache_headers(etag, CARD_IMAGE_CACHE_CONTROL))
+
+
+@app.get("/api/gallery/{card_id}/similar")
+def get_similar_cards(card_id: int, limit: int = 10, db: Session = Depends(get_db)):
+    """Cards whose latent vectors are closest (cosine) to this card's"""
+
+    if limit > 50:
+        limit = 50
+
+    latent = similarity_index.get(card_id)
+    if latent is None:
+        if not db.query(GeneratedCard.id).filter(GeneratedCard.id == card_id).first():
+            raise HTTPException(status_code=404, detail="Card not found")
+        raise HTTPException(status_code=404, detail="Card has no stored latent vector")
+
+    matches = similarity_index.query(latent, k=limit, exclude_id=card_id)
+    match_ids = [match_id for match_id, _ in matches]
+    cards = {
+        row.id: row
+        for row in db.query(GeneratedCard.id, GeneratedCard.upvotes, GeneratedCard.created_at)
+        .filter(GeneratedCard.id.in_(match_ids))
+    }
+    images = card_images(db, match_ids)
+
+    return {
+        "cards": [
+            {
+                "id": match_id,
+                "image": data_uri(images.get(match_id)),
+                "upvotes": cards[match_id].upvotes,
+                "created_at": cards[match_id].created_at,
+                "similarity": score
+            }
+            for match_id, score in matches
+            if match_id in cards
+        ]
+    }
+
+
 @app.post("/api/gallery/{card_id}/upvote")
-def upvote_card(card_id: int, db: Session = Depends(get_db)):
+async def upvote_card(card_id: int):
     """Upvote a card in the gallery"""
-    return vote_card(card_id, 1, db)
+    return await vote_card(card_id, 1)
 
 
 @app.post("/api/gallery/{card_id}/downvote")
-def downvote_card(card_id: int, db: Session = Depends(get_db)):
+async def downvote_card(card_id: int):
     """Downvote a card in the gallery"""
-    return vote_card(card_id, -1, db)
+    return await vote_card(card_id, -1)
 
 
-def vote_card(card_id: int, delta: int, db: Session):
+async def vote_card(card_id: int, delta: int):
     """Helper function to handle voting (upvote or downvote)"""
-    card = db.query(GeneratedCard).filter(GeneratedCard.id == card_id).first()
-
-    if not card:
+    def apply_vote(db):
+        card = db.get(GeneratedCard, card_id)
+        if not card:
+            return None
+        card.upvotes += delta
+        # SQL-side increment so a concurrent decay batch is never overwritten
+        card.hot_score = GeneratedCard.hot_score + delta * VOTE_SCORE
+        db.flush()
+        return card.upvotes
+
+    new_upvotes = await run_write(apply_vote)
+    if new_upvotes is None:
         raise HTTPException(status_code=404, detail="Card not found")
 
-    card.upvotes += delta
-    db.commit()
-
     action = "Upvote" if delta > 0 else "Downvote"
     return {
         "success": True,
-        "new_upvote_count": card.upvotes,
+        "new_upvote_count": new_upvotes,
         "message": f"{action} added successfully"
     }
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Admin endpoints need the X-Admin-Token header to match ADMIN_TOKEN (disabled when unset)"""
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+class DefaultModelRequest(BaseModel):
+    name: str = Field(min_length=1)
+
+
+@app.post("/api/admin/models/default", dependencies=[Depends(require_admin)])
+def set_default_model(request: DefaultModelRequest):
+    """Load and warm a checkpoint, then make it the default without dropping in-flight requests"""
+    name = request.name
+
+    def warm(model):
+        warm_up_models(model.netG, model.netD, [1], device)
+
+    try:
+        previous = model_registry.set_default(name, prepare=warm)
+    except ModelNotFound:
+        raise HTTPException(status_code=404, detail=f"Model '{name}' not found")
+
+    return {
+        "success": True,
+        "default": name,
+        "previous": previous,
+        "message": f"Default model switched to {name}"
+    }
+
+
+@app.get("/api/admin/export", dependencies=[Depends(require_admin)])
+def export_gallery():
+    """Stream the whole gallery as NDJSON, one batch of rows in memory at a time"""
+
+    # Own session: the response body is streamed after request dependencies have exited
+    def stream():
+        db = SessionLocal()
+        try:
+            yield from iter_ndjson(db)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="gallery.ndjson"'}
+    )
+
+
+@app.post("/api/admin/similarity/rebuild", dependencies=[Depends(require_admin)])
+async def rebuild_similarity():
+    """Reload the similarity index from the DB, e.g. after a CLI import into a running backend"""
+    await run_in_threadpool(rebuild_similarity_index)
+    return {"success": True, "indexed": len(similarity_index)}
+
+
+@app.post("/api/admin/import", dependencies=[Depends(require_admin)])
+async def import_gallery(request: Request, new_ids: bool = False):
+    """Bulk import an NDJSON export streamed in the request body"""
+    db = SessionLocal()
+    count = 0
+    batch = []
+    buffer = b""
+
+    try:
+        async for chunk in request.stream():
+            # Only complete lines are parsed, the trailing partial line waits for the next chunk
+            *lines, buffer = (buffer + chunk).split(b"\n")
+            for record in read_ndjson(lines):
+                batch.append(record)
+                if len(batch) >= BATCH_SIZE:
+                    count += await run_in_threadpool(import_batch, db, batch, not new_ids)
+                    batch = []
+
+        batch.extend(read_ndjson([buffer]))
+        count += await run_in_threadpool(import_batch, db, batch, not new_ids)
+        await run_in_threadpool(finish_import, db)
+        await run_in_threadpool(rebuild_similarity_index)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Invalid import data after {count} cards: {e}")
+    except DuplicateCardIds:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=f"Card ids already exist after {count} cards, retry with new_ids=true")
+    finally:
+        db.close()
+
+    return {
+        "success": True,
+        "imported": count,
+        "message": f"Imported {count} cards"
+    }
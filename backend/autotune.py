@@ -0,0 +1,172 @@
+"""Startup autotuner for generator inference settings.
+
+Benchmarks netG over a small grid of intra-op thread counts, batch sizes and
+memory formats, then keeps the configuration with the best throughput whose
+per-batch latency stays within budget. Results are persisted per host so
+restarts on the same instance type skip the benchmark.
+"""
+
+import json
+import math
+import os
+import platform
+import statistics
+import time
+from pathlib import Path
+
+import torch
+
+from models import nz
+
+AUTOTUNE_CACHE = Path(os.getenv("AUTOTUNE_CACHE", "checkpoints/autotune.json"))
+LATENCY_BUDGET_MS = float(os.getenv("AUTOTUNE_LATENCY_BUDGET_MS", "250"))
+BATCH_SIZES = [1, 4, 8, 16, 32]
+MEMORY_FORMATS = ["contiguous", "channels_last"]
+
+
+def autotune_enabled():
+    return os.getenv("AUTOTUNE", "false").lower() in ("1", "true", "yes")
+
+
+def cgroup_cpu_quota(cgroup_root="/sys/fs/cgroup"):
+    """Container CPU limit in cores (e.g. 0.5, 2.0), None when unlimited or unknown"""
+    root = Path(cgroup_root)
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        quota, period = (root / "cpu.max").read_text().split()
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        # cgroup v1: quota is -1 when unlimited
+        quota = int((root / "cpu" / "cpu.cfs_quota_us").read_text())
+        period = int((root / "cpu" / "cpu.cfs_period_us").read_text())
+        return None if quota <= 0 else quota / period
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus(cgroup_root="/sys/fs/cgroup"):
+    """CPUs this process can actually use: its affinity mask, capped by the container quota.
+
+    os.cpu_count() reports the whole host, so differently sized containers on the
+    same machine type would otherwise look identical.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS/Windows
+        cpus = os.cpu_count() or 1
+    quota = cgroup_cpu_quota(cgroup_root)
+    if quota is not None:
+        cpus = min(cpus, max(1, math.floor(quota)))
+    return cpus
+
+
+def thread_candidates(device):
+    # Thread count only matters for CPU inference
+    if device.type != "cpu":
+        return [torch.get_num_threads()]
+    cores = available_cpus()
+    return sorted({n for n in [1, 2, 4, cores // 2, cores] if 1 <= n <= cores})
+
+
+def host_signature(device):
+    """Everything that invalidates a saved tuning result"""
+    return {
+        "cpu_count": available_cpus(),
+        "cpu_quota": cgroup_cpu_quota(),
+        "machine": platform.machine(),
+        "torch": torch.__version__,
+        "device": str(device),
+    }
+
+
+def default_settings():
+    return {
+        "num_threads": torch.get_num_threads(),
+        "batch_size": 1,
+        "memory_format": "contiguous",
+        "source": "default",
+    }
+
+
+def apply_settings(netG, settings):
+    torch.set_num_threads(settings["num_threads"])
+    memory_format = torch.channels_last if settings["memory_format"] == "channels_last" else torch.contiguous_format
+    netG.to(memory_format=memory_format)
+
+
+def benchmark(netG, device, num_threads, batch_size, memory_format, repeats=5, warmup=2):
+    """Median latency (ms) of one batched forward pass under the given settings"""
+    apply_settings(netG, {"num_threads": num_threads, "memory_format": memory_format})
+    noise = torch.randn(batch_size, nz, 1, 1, device=device)
+
+    timings = []
+    with torch.no_grad():
+        for i in range(warmup + repeats):
+            start = time.perf_counter()
+            netG(noise)
+            if device.type == "cuda":
+                torch.cuda.synchronize()
+            if i >= warmup:
+                timings.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(timings)
+
+
+def autotune(netG, device, batch_sizes=BATCH_SIZES, memory_formats=MEMORY_FORMATS,
+             threads=None, latency_budget_ms=LATENCY_BUDGET_MS, repeats=5):
+    """Benchmark the grid and return the best settings (falls back to batch size 1 if nothing fits)"""
+    results = []
+    for num_threads in threads or thread_candidates(device):
+        for memory_format in memory_formats:
+            for batch_size in batch_sizes:
+                latency_ms = benchmark(netG, device, num_threads, batch_size, memory_format, repeats)
+                results.append({
+                    "num_threads": num_threads,
+                    "batch_size": batch_size,
+                    "memory_format": memory_format,
+                    "latency_ms": round(latency_ms, 3),
+                    "throughput": round(batch_size / latency_ms * 1000, 2),
+                })
+
+    within_budget = [r for r in results if r["latency_ms"] <= latency_budget_ms]
+    if within_budget:
+        best = max(within_budget, key=lambda r: r["throughput"])
+    else:
+        # Nothing fits: serve single cards with the fastest configuration
+        best = min((r for r in results if r["batch_size"] == min(batch_sizes)), key=lambda r: r["latency_ms"])
+
+    return {**best, "latency_budget_ms": latency_budget_ms, "source": "autotune", "results": results}
+
+
+def load_cached_settings(path, signature):
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return cached if cached.get("signature") == signature else None
+
+
+def save_settings(path, settings):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(settings, f, indent=2)
+
+
+def tune_or_load(netG, device, path=AUTOTUNE_CACHE, **autotune_args):
+    """Reuse this host's saved result if there is one, otherwise benchmark and save"""
+    signature = host_signature(device)
+    settings = load_cached_settings(path, signature)
+
+    if settings is None:
+        settings = autotune(netG, device, **autotune_args)
+        settings["signature"] = signature
+        save_settings(path, settings)
+    else:
+        settings["source"] = "cache"
+
+    apply_settings(netG, settings)
+    return settings
@@ -0,0 +1,119 @@
+"""Build-time pack asset pipeline.
+
+Batch-generates a large card pool with the Generator, packs it into WebP
+sprite atlases (or one WebP per card) and writes a manifest.json with each
+card's location, seed and pre-assigned rarity. The frontend draws packs from
+this pool as static files, so pack opening needs no live inference.
+
+    python build_packs.py --count 4096 --out ../assets/packs
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+
+import torch
+from PIL import Image
+
+from inference import load_generator, seed_latents, tensors_to_images
+from rarity import get_random_rarity, RARITY_WEIGHTS
+
+CARD_WIDTH = 64
+CARD_HEIGHT = 96
+
+
+def generate_pool(netG, count, batch_size=256, start_seed=0, device="cpu"):
+    """Yield (seed, PIL image) for `count` cards, one batched forward pass per batch"""
+    for batch_start in range(0, count, batch_size):
+        seeds = list(range(start_seed + batch_start, start_seed + min(count, batch_start + batch_size)))
+        with torch.no_grad():
+            fake_images = netG(seed_latents(seeds, device))
+        yield from zip(seeds, tensors_to_images(fake_images))
+
+
+def save_webp(img, path, quality, lossless):
+    img.save(path, format="WEBP", quality=quality, lossless=lossless, method=6)
+
+
+def build_pack_pool(netG, out_dir, count, layout="atlas", columns=16, rows=16,
+                    batch_size=256, start_seed=0, quality=80, lossless=False, device="cpu"):
+    """Generate the pool into out_dir and return the manifest dict"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    per_atlas = columns * rows
+
+    manifest = {
+        "version": 1,
+        "layout": layout,
+        "card_width": CARD_WIDTH,
+        "card_height": CARD_HEIGHT,
+        "rarity_weights": RARITY_WEIGHTS,
+        "atlases": [],
+        "cards": [],
+    }
+
+    atlas = None
+    for i, (seed, img) in enumerate(generate_pool(netG, count, batch_size, start_seed, device)):
+        # Rarity derived from the seed, so rebuilding the same pool gives the same tiers
+        card = {"seed": seed, "rarity": get_random_rarity(random.Random(seed))}
+
+        if layout == "files":
+            name = f"card_{seed}.webp"
+            save_webp(img, out_dir / name, quality, lossless)
+            card["file"] = name
+        else:
+            slot = i % per_atlas
+            if slot == 0:
+                atlas = Image.new("RGB", (columns * CARD_WIDTH, rows * CARD_HEIGHT))
+                manifest["atlases"].append(f"atlas_{len(manifest['atlases']):03d}.webp")
+
+            x, y = (slot % columns) * CARD_WIDTH, (slot // columns) * CARD_HEIGHT
+            atlas.paste(img, (x, y))
+            card.update({"atlas": len(manifest["atlases"]) - 1, "x": x, "y": y})
+
+            # Flush the sheet once it's full or the pool is done
+            if slot == per_atlas - 1 or i == count - 1:
+                if i == count - 1 and slot != per_atlas - 1:
+                    # Crop the last sheet to the rows actually used
+                    atlas = atlas.crop((0, 0, atlas.width, (slot // columns + 1) * CARD_HEIGHT))
+                save_webp(atlas, out_dir / manifest["atlases"][-1], quality, lossless)
+
+        manifest["cards"].append(card)
+
+    with open(out_dir / "manifest.json", "w") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate the pack card pool as static WebP assets")
+    parser.add_argument("--checkpoint", default="checkpoints/gan_checkpoint.pth")
+    parser.add_argument("--out", default="../assets/packs")
+    parser.add_argument("--count", type=int, default=4096, help="cards in the pool")
+    parser.add_argument("--layout", choices=["atlas", "files"], default="atlas",
+                        help="sprite atlases (fewest requests) or one WebP per card")
+    parser.add_argument("--columns", type=int, default=16, help="cards per atlas row")
+    parser.add_argument("--rows", type=int, default=16, help="card rows per atlas")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--start-seed", type=int, default=0)
+    parser.add_argument("--quality", type=int, default=80, help="lossy WebP quality")
+    parser.add_argument("--lossless", action="store_true")
+    args = parser.parse_args()
+
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    netG = load_generator(args.checkpoint, device)
+
+    manifest = build_pack_pool(
+        netG, args.out, args.count, layout=args.layout, columns=args.columns, rows=args.rows,
+        batch_size=args.batch_size, start_seed=args.start_seed, quality=args.quality,
+        lossless=args.lossless, device=device,
+    )
+
+    files = len(manifest["atlases"]) if args.layout == "atlas" else len(manifest["cards"])
+    print(f"Wrote {len(manifest['cards'])} cards in {files} WebP files to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""HTTP conditional caching helpers (strong ETags, If-None-Match, 304)"""
+
+import hashlib
+
+from fastapi import Response
+
+# Listings change with every vote, so caches must revalidate (cheap thanks to the ETag)
+GALLERY_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+# Card images never change once shared
+CARD_IMAGE_CACHE_CONTROL = "public, max-age=86400"
+# Seeded output only changes when the checkpoint does, and the ETag includes the checkpoint.
+# With ?version= (the checkpoint sha256) in the URL, the URL names the exact weights, so it can be cached for a day
+SEEDED_CACHE_CONTROL = "public, max-age=86400"
+# Without it the default model can be swapped, and a checkpoint file replaced in place, under the same URL
+UNPINNED_CACHE_CONTROL = "public, no-cache"
+NO_STORE = "no-store"
+
+
+def seeded_cache_control(version_in_url):
+    return SEEDED_CACHE_CONTROL if version_in_url else UNPINNED_CACHE_CONTROL
+
+
+def make_etag(*parts):
+    """Strong ETag from anything with a stable repr"""
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def etag_matches(request, etag):
+    """True when the request's If-None-Match already names this ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison is what If-None-Match specifies, so ignore W/ prefixes
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag in candidates
+
+
+def cache_headers(etag, cache_control):
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def not_modified(etag, cache_control):
+    return Response(status_code=304, headers=cache_headers(etag, cache_control))
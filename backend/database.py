@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, Text, TIMESTAMP, Index
+from sqlalchemy import create_engine, event, Column, Integer, BigInteger, Float, String, Text, LargeBinary, TIMESTAMP, Index, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -17,13 +17,37 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if DATABASE_URL and DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
+# SQLite tuning, applied to every new connection (small self-hosted deployments and tests)
+SQLITE_PRAGMAS = [
+    # Readers see the last committed snapshot and never block on (or block) the writer
+    "journal_mode=WAL",
+    # In WAL mode NORMAL only fsyncs at checkpoints; a power cut can lose the last commits, never corrupt
+    f"synchronous={os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')}",
+    # Negative = KiB, per connection
+    f"cache_size=-{int(os.getenv('SQLITE_CACHE_SIZE_KB', '65536'))}",
+    f"mmap_size={int(os.getenv('SQLITE_MMAP_SIZE_MB', '256')) * 1024 * 1024}",
+    "temp_store=MEMORY",
+    # Wait for the write lock (e.g. the hot-score decay job) instead of failing with "database is locked"
+    f"busy_timeout={int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))}",
+]
+
+# Logging every statement costs more than the statements themselves on SQLite, so it's opt-in there
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() in ("1", "true", "yes")
+
 if DATABASE_URL and "sqlite" in DATABASE_URL:
-    # SQLite (testing) - minimal config with threading override for tests
+    # SQLite - WAL + pragmas below; writes go through one batching writer (writequeue.py)
     engine = create_engine(
         DATABASE_URL,
-        echo=True,
-        connect_args={"check_same_thread": False}  # Allow FastAPI TestClient to work
+        echo=SQL_ECHO,
+        connect_args={"check_same_thread": False}  # Sessions are used from the threadpool and the writer thread
     )
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
 else:
     # PostgreSQL (production) - with connection pooling
     engine = create_engine(
@@ -43,28 +67,115 @@ Base = declarative_base()
 
 # Database Model
 class GeneratedCard(Base): 
-    # Table : id (int), image (base64), upvotes (int), created (datetime)
+    # Table : id (int), image (base64), upvotes (int), created (datetime), hot score (float), latent (float32 bytes),
+    #         seed (int), model (checkpoint name), model version (checkpoint sha256)
     __tablename__ = "generated_cards"
 
     id = Column(Integer, primary_key=True, index=True)
-    image_data = Column(Text, nullable=False)
+    # Uploaded image; NULL for seed-only cards, which are re-rendered from (seed, model) by render.py
+    image_data = Column(Text, nullable=True)
     upvotes = Column(Integer, default=0, index=True)
     created_at = Column(TIMESTAMP, default=datetime.now(), index=True)
+    # Time-decayed popularity, bumped by votes and decayed in batches by ranking.py
+    hot_score = Column(Float, default=0.0, server_default="0", nullable=False)
+    # The nz float32 latent the card was generated from (only for cards from our generator)
+    latent = Column(LargeBinary, nullable=True)
+    seed = Column(BigInteger, nullable=True)
+    model = Column(String(64), nullable=True)
+    # sha256 of the checkpoint file, so a checkpoint replaced under the same name can't silently change the card
+    model_version = Column(String(64), nullable=True)
 
     # Sort by upvotes vs created date indexing performance optimization
     __table_args__ = (
         Index('idx_upvotes_desc', upvotes.desc()),
         Index('idx_created_at_desc', created_at.desc()),
+        # Matches ORDER BY hot_score DESC, id DESC so top-N reads stop after `limit` rows
+        Index('idx_hot_score_desc', hot_score.desc(), id.desc()),
     )
 
 
+class HotDecayState(Base):
+    # Single row (id=1): wall-clock time (naive UTC) up to which hot scores have been decayed
+    __tablename__ = "hot_decay_state"
+
+    id = Column(Integer, primary_key=True)
+    decayed_at = Column(TIMESTAMP, nullable=False)
+
+
+def add_missing_columns():
+    """Add columns/indexes introduced after a table was first created (create_all skips existing tables)"""
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        with engine.begin() as conn:
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                default = f" DEFAULT {column.server_default.arg}" if column.server_default is not None else ""
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}{default}"))
+                print(f"Added column {table.name}.{column.name}")
+
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+        relaxed = [
+            column["name"] for column in inspect(engine).get_columns(table.name)
+            if not column["nullable"] and table.columns[column["name"]].nullable
+            and not table.columns[column["name"]].primary_key
+        ]
+        if relaxed:
+            drop_not_null(table, relaxed)
+
+
+def drop_not_null(table, column_names):
+    """Make existing columns nullable (PostgreSQL alters in place, SQLite needs a table rebuild)"""
+    if engine.dialect.name != "sqlite":
+        with engine.begin() as conn:
+            for name in column_names:
+                conn.execute(text(f"ALTER TABLE {table.name} ALTER COLUMN {name} DROP NOT NULL"))
+        print(f"Dropped NOT NULL on {table.name}.{', '.join(column_names)}")
+        return
+
+    # SQLite can't change constraints: copy into a table with the current schema, then swap names
+    old_name = f"{table.name}_old"
+    columns = ", ".join(c["name"] for c in inspect(engine).get_columns(table.name))
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {table.name} RENAME TO {old_name}"))
+        for index in table.indexes:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+        table.create(bind=conn)
+        conn.execute(text(f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {old_name}"))
+        conn.execute(text(f"DROP TABLE {old_name}"))
+    print(f"Rebuilt {table.name} to drop NOT NULL on {', '.join(column_names)}")
+
+
 # Initialize database
 def init_db():
     """Create all tables in the database"""
     Base.metadata.create_all(bind=engine)
+    add_missing_columns()
     print("Database tables created")
 
 
+def prewarm_pool():
+    """Open (and return) pool_size connections up front so the first requests don't pay for connecting"""
+    pool_size = engine.pool.size() if hasattr(engine.pool, "size") else 1
+    connections = []
+    try:
+        for _ in range(pool_size):
+            conn = engine.connect()
+            conn.execute(text("SELECT 1"))
+            connections.append(conn)
+    finally:
+        for conn in connections:
+            conn.close()
+    return len(connections)
+
+
 # Dependency for getting database session
 def get_db():
     """Dependency for getting database session in FastAPI routes"""
@@ -0,0 +1,294 @@
+"""Streaming export / import of the generated_cards table.
+
+Both directions work in fixed-size batches so memory stays flat however big
+the gallery is: exports stream rows with yield_per (server-side cursors on
+PostgreSQL) and imports go through batched bulk inserts.
+
+Formats:
+  - NDJSON: one JSON object per card, image included as base64
+  - tar:    manifest.ndjson (card metadata) followed by images/<id>.png
+
+    python gallery_io.py export gallery.ndjson
+    python gallery_io.py export gallery.tar
+    python gallery_io.py import gallery.tar
+
+Imported records are validated before anything is written: each must be an
+object with image_data or a seed, and every field must have its column's type.
+Images go through the same checks and canonical PNG encoding as a share. The
+CLI writes straight to the database, so a running backend only adds imported
+cards to its similarity index after a restart or POST /api/admin/similarity/rebuild.
+"""
+
+import argparse
+import base64
+import json
+import shutil
+import sys
+import tarfile
+import tempfile
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Integer, LargeBinary, String, insert, select, text
+from sqlalchemy.exc import IntegrityError
+
+from database import GeneratedCard, SessionLocal, engine
+from ingest import canonicalize_card_image
+
+BATCH_SIZE = 500
+TABLE = GeneratedCard.__table__
+MANIFEST_NAME = "manifest.ndjson"
+INT64_RANGE = range(-2**63, 2**63)
+
+
+class DuplicateCardIds(Exception):
+    pass
+
+
+def encode_value(column, value):
+    if value is None:
+        return None
+    if isinstance(column.type, DateTime):
+        return value.isoformat()
+    if isinstance(column.type, LargeBinary):
+        return base64.b64encode(value).decode()
+    return value
+
+
+def decode_value(column, value):
+    """JSON value -> column value, raising ValueError/TypeError when it has the wrong type"""
+    if value is None:
+        return None
+    if isinstance(column.type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, LargeBinary):
+        return base64.b64decode(value, validate=True)
+    # bool is an int subclass in Python, but true/false is never a valid count or seed
+    if isinstance(column.type, Integer):
+        if not isinstance(value, int) or isinstance(value, bool) or value not in INT64_RANGE:
+            raise ValueError("expected a 64-bit integer")
+        return value
+    if isinstance(column.type, Float):
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            raise ValueError("expected a number")
+        return float(value)
+    if isinstance(column.type, String):
+        if not isinstance(value, str):
+            raise ValueError("expected a string")
+        if column.type.length and len(value) > column.type.length:
+            raise ValueError(f"longer than {column.type.length} characters")
+    return value
+
+
+def encode_row(row, skip=()):
+    return {c.name: encode_value(c, row._mapping[c.name]) for c in TABLE.columns if c.name not in skip}
+
+
+def decode_record(record, keep_ids=True):
+    """JSON record -> validated insertable row, ignoring fields this schema doesn't know"""
+    if not isinstance(record, dict):
+        raise ValueError("Each record must be a JSON object")
+
+    row = {}
+    for column in TABLE.columns:
+        if column.name not in record:
+            continue
+        try:
+            value = decode_value(column, record[column.name])
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid {column.name}: {e}")
+        if value is None and not column.nullable and not column.primary_key:
+            raise ValueError(f"{column.name} can't be null")
+        row[column.name] = value
+
+    if row.get("image_data") is None and row.get("seed") is None:
+        raise ValueError("Each card needs image_data or a seed")
+    if row.get("image_data") is not None:
+        # Same 64x96 RGB check and canonical PNG as /api/gallery/share (InvalidImage is a ValueError)
+        row["image_data"] = canonicalize_card_image(row["image_data"])
+    if not keep_ids:
+        row.pop("id", None)
+    return row
+
+
+def stream_rows(db, columns=None, batch_size=BATCH_SIZE):
+    """Iterate table rows in id order without ever holding more than one batch"""
+    stmt = select(*(columns or TABLE.columns)).order_by(TABLE.c.id)
+    return db.execute(stmt.execution_options(yield_per=batch_size))
+
+
+def iter_ndjson(db, batch_size=BATCH_SIZE):
+    """Yield the table as NDJSON lines (bytes), e.g. for a StreamingResponse"""
+    for row in stream_rows(db, batch_size=batch_size):
+        yield (json.dumps(encode_row(row)) + "\n").encode()
+
+
+def export_ndjson(db, out, batch_size=BATCH_SIZE):
+    count = 0
+    for line in iter_ndjson(db, batch_size):
+        out.write(line)
+        count += 1
+    return count
+
+
+def export_tar(db, out, batch_size=BATCH_SIZE):
+    """Write manifest.ndjson then one PNG per card, as an uncompressed streamed tar"""
+    metadata_columns = [c for c in TABLE.columns if c.name != "image_data"]
+    count = 0
+
+    with tarfile.open(fileobj=out, mode="w|") as tar:
+        # Pass 1: metadata only, spooled to disk past a few MB so the manifest can lead the archive
+        with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as manifest:
+            columns = metadata_columns + [TABLE.c.image_data.isnot(None).label("has_image")]
+            for row in stream_rows(db, columns, batch_size):
+                record = encode_row(row, skip={"image_data"})
+                record["image"] = f"images/{row.id}.png" if row.has_image else None
+                manifest.write((json.dumps(record) + "\n").encode())
+                count += 1
+
+            info = tarfile.TarInfo(MANIFEST_NAME)
+            info.size = manifest.tell()
+            manifest.seek(0)
+            tar.addfile(info, manifest)
+
+        # Pass 2: images in the same id order as the manifest
+        for row in stream_rows(db, [TABLE.c.id, TABLE.c.image_data], batch_size):
+            if row.image_data is None:
+                continue
+            png = base64.b64decode(row.image_data)
+            info = tarfile.TarInfo(f"images/{row.id}.png")
+            info.size = len(png)
+            tar.addfile(info, _BytesReader(png))
+
+    return count
+
+
+class _BytesReader:
+    """Minimal file object for tar.addfile without copying into BytesIO"""
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def read(self, size=-1):
+        end = len(self.data) if size < 0 else self.pos + size
+        chunk = self.data[self.pos:end]
+        self.pos += len(chunk)
+        return bytes(chunk)
+
+
+def insert_batch(db, rows):
+    """Bulk insert one batch of decoded rows in a single transaction"""
+    if not rows:
+        return 0
+
+    # An executemany needs the same columns in every row, and records may leave out different optional fields
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(row), []).append(row)
+    try:
+        for group in groups.values():
+            db.execute(insert(TABLE), group)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        ids = [row["id"] for row in rows if row.get("id") is not None]
+        if ids and (len(set(ids)) < len(ids) or db.execute(select(TABLE.c.id).where(TABLE.c.id.in_(ids)).limit(1)).first()):
+            raise DuplicateCardIds("Card ids already exist") from e
+        raise ValueError(f"Rows violate a database constraint: {e.orig}") from e
+    return len(rows)
+
+
+def import_batch(db, records, keep_ids=True):
+    """Validate and insert one batch of JSON records"""
+    return insert_batch(db, [decode_record(record, keep_ids) for record in records])
+
+
+def finish_import(db):
+    """Move the PostgreSQL id sequence past imported ids (SQLite tracks this itself)"""
+    if engine.dialect.name == "postgresql":
+        db.execute(text(
+            "SELECT setval(pg_get_serial_sequence('generated_cards', 'id'), "
+            "(SELECT COALESCE(MAX(id), 1) FROM generated_cards))"
+        ))
+        db.commit()
+
+
+def import_records(db, records, keep_ids=True, batch_size=BATCH_SIZE):
+    """Insert an iterable of JSON records in batches, returns the number imported"""
+    count = 0
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            count += import_batch(db, batch, keep_ids)
+            batch = []
+    count += import_batch(db, batch, keep_ids)
+    finish_import(db)
+    return count
+
+
+def read_ndjson(lines):
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def read_tar(fileobj):
+    """Yield card records from a streamed tar export, pairing manifest lines with images"""
+    with tarfile.open(fileobj=fileobj, mode="r|") as tar:
+        first = tar.next()
+        if first is None or first.name != MANIFEST_NAME:
+            raise ValueError(f"Archive must start with {MANIFEST_NAME}")
+
+        with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as manifest:
+            shutil.copyfileobj(tar.extractfile(first), manifest)
+            manifest.seek(0)
+
+            for record in read_ndjson(manifest):
+                image_name = record.pop("image", None)
+                if image_name is not None:
+                    member = tar.next()
+                    if member is None or member.name != image_name:
+                        raise ValueError(f"Expected {image_name} in archive, found {member and member.name}")
+                    record["image_data"] = base64.b64encode(tar.extractfile(member).read()).decode()
+                else:
+                    record["image_data"] = None
+                yield record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import the gallery without loading it all into memory")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", help="file to write/read, '-' for stdout/stdin")
+    parser.add_argument("--format", choices=["ndjson", "tar"], help="defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--new-ids", action="store_true", help="let the database assign new ids on import")
+    args = parser.parse_args()
+
+    fmt = args.format or ("tar" if args.path.endswith(".tar") else "ndjson")
+    engine.echo = False
+    db = SessionLocal()
+
+    try:
+        if args.command == "export":
+            out = sys.stdout.buffer if args.path == "-" else open(args.path, "wb")
+            with out:
+                if fmt == "tar":
+                    count = export_tar(db, out, args.batch_size)
+                else:
+                    count = export_ndjson(db, out, args.batch_size)
+            print(f"Exported {count} cards", file=sys.stderr)
+        else:
+            source = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+            with source:
+                records = read_tar(source) if fmt == "tar" else read_ndjson(source)
+                count = import_records(db, records, keep_ids=not args.new_ids, batch_size=args.batch_size)
+            print(f"Imported {count} cards. Restart running backends or POST /api/admin/similarity/rebuild "
+                  f"to add them to the similarity index", file=sys.stderr)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import io
+import base64
+
+import torch
+from PIL import Image
+
+from models import Generator, Discriminator, nz
+
+
+def load_models(ckpt_path, device):
+    """Build the Generator (and Discriminator, when the checkpoint has one) from a training checkpoint"""
+    ngpu = 1 if torch.cuda.is_available() else 0
+    checkpoint = torch.load(ckpt_path, map_location=device)
+
+    netG = Generator(ngpu=ngpu).to(device)
+    netG.load_state_dict(checkpoint['generator_state_dict'])
+    netG.eval()
+
+    netD = None
+    if 'discriminator_state_dict' in checkpoint:
+        netD = Discriminator(ngpu=ngpu).to(device)
+        netD.load_state_dict(checkpoint['discriminator_state_dict'])
+        netD.eval()
+
+    return netG, netD
+
+
+def load_generator(ckpt_path, device):
+    return load_models(ckpt_path, device)[0]
+
+
+def seed_latent(seed, device="cpu"):
+    """Deterministic latent vector (1 x nz x 1 x 1) for a given seed"""
+    gen = torch.Generator().manual_seed(seed)
+    return torch.randn(1, nz, 1, 1, generator=gen).to(device)
+
+
+def seed_latents(seeds, device="cpu"):
+    """Stack the latents of many seeds into one (len(seeds) x nz x 1 x 1) batch"""
+    return torch.cat([seed_latent(seed) for seed in seeds]).to(device)
+
+
+def slerp(a, b, t):
+    """Spherical interpolation between two flat latent vectors"""
+    a_norm = a / a.norm()
+    b_norm = b / b.norm()
+    omega = torch.acos((a_norm * b_norm).sum().clamp(-1, 1))
+    so = torch.sin(omega)
+
+    # Nearly parallel vectors: slerp degenerates to lerp
+    if so.abs() < 1e-6:
+        return (1 - t) * a + t * b
+    return (torch.sin((1 - t) * omega) / so) * a + (torch.sin(t * omega) / so) * b
+
+
+def interpolate_latents(a, b, frames, mode="linear"):
+    """Build a (frames x nz x 1 x 1) batch walking from latent a to latent b"""
+    a = a.flatten()
+    b = b.flatten()
+    steps = torch.linspace(0, 1, frames, device=a.device)
+
+    if mode == "slerp":
+        path = torch.stack([slerp(a, b, t) for t in steps])
+    else:
+        # Linear: one broadcasted lerp for every frame
+        path = torch.lerp(a.unsqueeze(0), b.unsqueeze(0), steps.unsqueeze(1))
+
+    return path.view(frames, nz, 1, 1)
+
+
+def tensors_to_images(batch):
+    """Convert a batch of generator outputs in [-1, 1] to PIL images"""
+    # Denormalize from [-1, 1] to [0, 255] in one pass for the whole batch
+    batch = ((batch + 1) / 2).clamp(0, 1)
+    arrays = (batch.permute(0, 2, 3, 1).cpu().numpy() * 255).astype('uint8')
+    return [Image.fromarray(arr) for arr in arrays]
+
+
+def image_to_base64(img, format="PNG"):
+    buffered = io.BytesIO()
+    img.save(buffered, format=format)
+    return base64.b64encode(buffered.getvalue()).decode()
+
+
+def encode_animation(frames, format="webp", duration=80):
+    """Encode a list of PIL frames as a looping animated WebP or GIF"""
+    buffered = io.BytesIO()
+    save_args = {
+        "save_all": True,
+        "append_images": frames[1:],
+        "duration": duration,
+        "loop": 0,
+    }
+    if format == "webp":
+        frames[0].save(buffered, format="WEBP", lossless=False, quality=80, method=4, **save_args)
+    else:
+        frames[0].save(buffered, format="GIF", optimize=True, **save_args)
+    return buffered.getvalue()
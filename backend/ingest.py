@@ -0,0 +1,86 @@
+"""Validated ingestion of shared card images.
+
+Share requests are read with a hard byte cap while the body streams in, so an
+oversized upload is rejected before it is buffered. The image is decoded and must
+match the generator's 64x96 RGB output. It is then re-encoded as a maximally
+compressed PNG with no metadata, so every stored card has the same small canonical
+form whatever the client sent.
+"""
+
+import base64
+import binascii
+import io
+import os
+import re
+from typing import Optional
+
+from PIL import Image, UnidentifiedImageError
+from pydantic import BaseModel
+
+CARD_SIZE = (64, 96)  # (width, height) of generator output
+# A raw 64x96 RGB card is 18 KB, so even an uncompressed PNG in base64 + JSON fits comfortably
+SHARE_MAX_BYTES = int(os.getenv("SHARE_MAX_BYTES", str(64 * 1024)))
+
+DATA_URI_PREFIX = re.compile(r"^data:image/[a-z]+;base64,")
+
+
+class ShareRequest(BaseModel):
+    # Either an uploaded image, or the seed (and model) of a card from our generator
+    image_data: Optional[str] = None
+    seed: Optional[int] = None
+    model: Optional[str] = None
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+class PayloadTooLarge(ValueError):
+    pass
+
+
+async def read_capped_body(request, max_bytes=None):
+    """Read the request body, giving up as soon as it passes max_bytes"""
+    max_bytes = max_bytes or SHARE_MAX_BYTES
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise PayloadTooLarge(f"Request body exceeds {max_bytes} bytes")
+
+    # Content-Length can be missing (chunked) or wrong, so count what actually arrives
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise PayloadTooLarge(f"Request body exceeds {max_bytes} bytes")
+    return bytes(body)
+
+
+def decode_card_image(image_data):
+    """Base64 (optionally a data: URI) -> validated RGB PIL image"""
+    try:
+        raw = base64.b64decode(DATA_URI_PREFIX.sub("", image_data.strip()), validate=True)
+    except (binascii.Error, ValueError):
+        raise InvalidImage("image_data is not valid base64")
+
+    try:
+        img = Image.open(io.BytesIO(raw))
+        # Image.open only reads the header, so the size check happens before any pixels are decoded
+        if img.size != CARD_SIZE:
+            raise InvalidImage(f"Image must be {CARD_SIZE[0]}x{CARD_SIZE[1]}, got {img.size[0]}x{img.size[1]}")
+        if img.mode != "RGB":
+            raise InvalidImage(f"Image must be RGB, got {img.mode}")
+        img.load()
+    except (UnidentifiedImageError, OSError):
+        raise InvalidImage("image_data is not a readable image")
+    return img
+
+
+def canonical_png(img):
+    """Re-encode as the smallest PNG Pillow can produce, dropping any metadata"""
+    buffered = io.BytesIO()
+    Image.frombytes("RGB", img.size, img.tobytes()).save(buffered, format="PNG", optimize=True)
+    return base64.b64encode(buffered.getvalue()).decode()
+
+
+def canonicalize_card_image(image_data):
+    return canonical_png(decode_card_image(image_data))
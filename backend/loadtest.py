@@ -0,0 +1,246 @@
+"""Offline load generator for the backend.
+
+Starts the app in-process with uvicorn against SQLite (with the generator
+checkpoint stubbed out the same way tests/conftest.py does, unless
+--real-model is given) and drives a weighted mix of generate, gallery-read,
+share and vote traffic from many concurrent simulated users.
+
+    python loadtest.py --users 200 --duration 30 --mix generate=1,gallery=6,share=1,vote=2
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import math
+import os
+import random
+import socket
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+from PIL import Image
+
+# share_seed is what the frontend does (seed-only, rendered on read), share uploads an image
+OPERATIONS = ["generate", "gallery", "share_seed", "share", "vote"]
+DEFAULT_MIX = "generate=1,gallery=6,share_seed=1,vote=2"
+MAX_SEED = 2**53 - 1
+
+
+def parse_mix(mix):
+    """Parse 'generate=1,gallery=6' into {operation: weight}"""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}', expected one of {OPERATIONS}")
+        weights[name] = float(weight or 1)
+
+    if sum(weights.values()) <= 0:
+        raise ValueError("Traffic mix needs at least one positive weight")
+    return weights
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(samples, elapsed):
+    """Aggregate (operation, latency_seconds, ok) samples into per-operation stats"""
+    by_op = defaultdict(list)
+    for op, latency, ok in samples:
+        by_op[op].append((latency, ok))
+        by_op["total"].append((latency, ok))
+
+    report = {}
+    for op, results in by_op.items():
+        latencies = sorted(latency for latency, _ in results)
+        errors = sum(1 for _, ok in results if not ok)
+        report[op] = {
+            "requests": len(results),
+            "throughput": len(results) / elapsed if elapsed else 0.0,
+            "error_rate": errors / len(results),
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p90_ms": percentile(latencies, 90) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "max_ms": latencies[-1] * 1000,
+        }
+    return report
+
+
+def print_report(report, elapsed, users):
+    print(f"\n{users} users for {elapsed:.1f}s")
+    print(f"{'operation':<10} {'requests':>9} {'req/s':>9} {'errors':>8} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for op in OPERATIONS + ["total"]:
+        if op not in report:
+            continue
+        s = report[op]
+        print(f"{op:<10} {s['requests']:>9} {s['throughput']:>9.1f} {s['error_rate']:>8.2%} "
+              f"{s['p50_ms']:>9.1f} {s['p90_ms']:>9.1f} {s['p99_ms']:>9.1f} {s['max_ms']:>9.1f}")
+
+
+def sample_card_image():
+    """Base64 PNG with the generator's 64x96 output size, used as share payload"""
+    img = Image.new("RGB", (64, 96), tuple(random.randrange(256) for _ in range(3)))
+    buffered = io.BytesIO()
+    img.save(buffered, format="PNG")
+    return base64.b64encode(buffered.getvalue()).decode()
+
+
+class LoadGenerator:
+    def __init__(self, base_url, weights, users, duration):
+        self.base_url = base_url
+        self.ops = list(weights)
+        self.weights = list(weights.values())
+        self.users = users
+        self.duration = duration
+        self.card_ids = []
+        self.samples = []
+        self.image_data = sample_card_image()
+
+    async def run_operation(self, client, op):
+        if op == "generate":
+            return await client.get("/api/card/generate")
+        if op == "gallery":
+            sort_by = random.choice(["popular", "recent"])
+            return await client.get(f"/api/gallery?sort_by={sort_by}&page={random.randint(1, 3)}&limit=20")
+        if op in ("share", "share_seed"):
+            response = await self.share(client, by_seed=op == "share_seed")
+            if response.status_code == 200:
+                self.card_ids.append(response.json()["id"])
+            return response
+
+        # Vote on a card we know exists (fall back to a gallery read when none do yet)
+        if not self.card_ids:
+            return await client.get("/api/gallery")
+        direction = "upvote" if random.random() < 0.8 else "downvote"
+        return await client.post(f"/api/gallery/{random.choice(self.card_ids)}/{direction}")
+
+    async def user(self, client, deadline):
+        while time.perf_counter() < deadline:
+            op = random.choices(self.ops, self.weights)[0]
+            start = time.perf_counter()
+            try:
+                response = await self.run_operation(client, op)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            self.samples.append((op, time.perf_counter() - start, ok))
+
+    async def share(self, client, by_seed):
+        if by_seed:
+            return await client.post("/api/gallery/share", json={"seed": random.randint(0, MAX_SEED)})
+        return await client.post("/api/gallery/share", json={"image_data": self.image_data})
+
+    async def seed_gallery(self, client, count):
+        # Mostly seed-only cards like real shares, so gallery reads go through the render path
+        for i in range(count):
+            response = await self.share(client, by_seed=i % 4 != 0)
+            response.raise_for_status()
+            self.card_ids.append(response.json()["id"])
+
+    async def run(self, seed_cards):
+        limits = httpx.Limits(max_connections=self.users, max_keepalive_connections=self.users)
+        async with httpx.AsyncClient(base_url=self.base_url, limits=limits, timeout=60) as client:
+            await self.seed_gallery(client, seed_cards)
+
+            start = time.perf_counter()
+            deadline = start + self.duration
+            await asyncio.gather(*(self.user(client, deadline) for _ in range(self.users)))
+            return time.perf_counter() - start
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_local_server(database_url, real_model, rate_limit, render_cache_size=None):
+    """Start the app with uvicorn in a background thread, return (server, thread, base_url)"""
+    os.environ["DATABASE_URL"] = database_url
+    if render_cache_size is not None:
+        # A small cache makes gallery reads hit the cold render path
+        os.environ["RENDER_CACHE_SIZE"] = str(render_cache_size)
+    # Every simulated user shares one IP, so per-client limits are off unless asked for
+    os.environ["RATE_LIMIT_ENABLED"] = "true" if rate_limit else "false"
+    import uvicorn
+
+    if not real_model:
+        # Same trick as tests/conftest.py: real state_dict keys, untrained weights.
+        # Left patched for the whole run since the app loads the model during startup.
+        import torch
+        from models import Generator, Discriminator
+        checkpoint = {
+            "generator_state_dict": Generator(ngpu=0).state_dict(),
+            "discriminator_state_dict": Discriminator(ngpu=0).state_dict(),
+        }
+        patch.object(torch, "load", return_value=checkpoint).start()
+        # The model registry only serves checkpoints that exist on disk
+        checkpoint_dir = tempfile.mkdtemp(prefix="loadtest-checkpoints-")
+        Path(checkpoint_dir, "gan_checkpoint.pth").touch()
+        os.environ["CHECKPOINT_DIR"] = checkpoint_dir
+
+    from app import app
+
+    # SQL echo would dominate the measurements
+    import database
+    database.engine.echo = False
+
+    port = free_port()
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("uvicorn failed to start")
+        time.sleep(0.05)
+
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the Fakemon backend")
+    parser.add_argument("--users", type=int, default=50, help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of traffic")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="weighted traffic mix")
+    parser.add_argument("--seed-cards", type=int, default=50, help="cards shared before the run starts")
+    parser.add_argument("--database-url", default="sqlite:///./loadtest.db")
+    parser.add_argument("--real-model", action="store_true", help="load the real checkpoint instead of a stub")
+    parser.add_argument("--rate-limit", action="store_true", help="keep per-client rate limiting enabled")
+    parser.add_argument("--render-cache-size", type=int, help="seed-only card render cache size (local server only)")
+    parser.add_argument("--url", help="target an already running server instead of starting one")
+    args = parser.parse_args()
+
+    weights = parse_mix(args.mix)
+
+    server = thread = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+    else:
+        server, thread, base_url = start_local_server(args.database_url, args.real_model, args.rate_limit, args.render_cache_size)
+
+    try:
+        generator = LoadGenerator(base_url, weights, args.users, args.duration)
+        elapsed = asyncio.run(generator.run(args.seed_cards))
+        print_report(summarize(generator.samples, elapsed), elapsed, args.users)
+    finally:
+        if server:
+            server.should_exit = True
+            thread.join()
+
+
+if __name__ == "__main__":
+    main()
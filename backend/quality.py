@@ -0,0 +1,70 @@
+"""Discriminator-scored best-of-N generation.
+
+Oversamples K latents, generates them in one batched netG pass, scores the
+whole batch with one netD pass and keeps the highest-scoring cards. Both
+networks run once per request regardless of K, so the extra cost grows much
+slower than K separate generations would.
+"""
+
+import os
+import threading
+import time
+
+import torch
+
+from inference import seed_latents
+
+QUALITY_DEFAULT_K = int(os.getenv("QUALITY_DEFAULT_K", "8"))
+QUALITY_MAX_K = int(os.getenv("QUALITY_MAX_K", "64"))
+
+
+def best_of_n(netG, netD, seeds, count=1, device="cpu"):
+    """Return ([(seed, image tensor, score)] best first, generator ms, discriminator ms)"""
+    with torch.no_grad():
+        start = time.perf_counter()
+        fake_images = netG(seed_latents(seeds, device))
+        generated = time.perf_counter()
+
+        # Discriminator output is the probability the image is a real card
+        scores = netD(fake_images).view(-1)
+        scored = time.perf_counter()
+
+    top_scores, top = scores.topk(min(count, len(seeds)))
+    best = [(seeds[i], fake_images[i:i + 1], score) for i, score in zip(top.tolist(), top_scores.tolist())]
+    return best, (generated - start) * 1000, (scored - generated) * 1000
+
+
+class QualityMetrics:
+    """Running cost totals for quality mode, to tune K against throughput"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.candidates = 0
+        self.generator_ms = 0.0
+        self.discriminator_ms = 0.0
+        self.score_total = 0.0
+        self.returned = 0
+
+    def record(self, candidates, scores, generator_ms, discriminator_ms):
+        with self.lock:
+            self.requests += 1
+            self.candidates += candidates
+            self.generator_ms += generator_ms
+            self.discriminator_ms += discriminator_ms
+            self.score_total += sum(scores)
+            self.returned += len(scores)
+
+    def snapshot(self):
+        with self.lock:
+            requests = self.requests or 1
+            candidates = self.candidates or 1
+            return {
+                "requests": self.requests,
+                "candidates_scored": self.candidates,
+                "avg_candidates": self.candidates / requests,
+                "avg_generator_ms": self.generator_ms / requests,
+                "avg_discriminator_ms": self.discriminator_ms / requests,
+                "avg_ms_per_candidate": (self.generator_ms + self.discriminator_ms) / candidates,
+                "avg_returned_score": self.score_total / (self.returned or 1),
+            }
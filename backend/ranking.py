@@ -0,0 +1,105 @@
+"""Time-decayed "hot" ranking for the gallery.
+
+Each card keeps a precomputed hot_score: sharing seeds it, every vote adds or
+removes one point, and a periodic job multiplies every score by the decay
+accumulated since its last run. The time of the last run is stored in the
+database, so time spent asleep or redeploying is decayed too. Because the decay is applied uniformly, the
+order between cards matches "votes weighted by exp(-age / half-life)" without
+ever recomputing from the full vote history.
+"""
+
+import asyncio
+import os
+from datetime import datetime, timezone
+
+from sqlalchemy import case, func, update
+from sqlalchemy.exc import IntegrityError
+
+from database import GeneratedCard, HotDecayState, SessionLocal
+
+HOT_HALF_LIFE_HOURS = float(os.getenv("HOT_HALF_LIFE_HOURS", "24"))
+HOT_DECAY_INTERVAL_SECONDS = float(os.getenv("HOT_DECAY_INTERVAL_SECONDS", "300"))
+HOT_DECAY_BATCH_SIZE = int(os.getenv("HOT_DECAY_BATCH_SIZE", "5000"))
+
+SHARE_SCORE = 1.0  # A freshly shared card starts with the weight of one upvote
+VOTE_SCORE = 1.0
+MIN_SCORE = 1e-3   # Scores this close to zero are snapped to 0 so cold rows stop being rewritten
+
+
+def decay_factor(elapsed_seconds, half_life_hours=HOT_HALF_LIFE_HOURS):
+    return 0.5 ** (elapsed_seconds / (half_life_hours * 3600))
+
+
+def decay_hot_scores(db, elapsed_seconds, batch_size=HOT_DECAY_BATCH_SIZE):
+    """Decay every non-zero hot_score in primary-key batches, one short transaction each"""
+    factor = decay_factor(elapsed_seconds)
+    decayed = GeneratedCard.hot_score * factor
+    max_id = db.query(func.max(GeneratedCard.id)).scalar() or 0
+
+    updated = 0
+    for start in range(0, max_id + 1, batch_size):
+        result = db.execute(
+            update(GeneratedCard)
+            .where(GeneratedCard.id >= start, GeneratedCard.id < start + batch_size, GeneratedCard.hot_score != 0)
+            .values(hot_score=case((func.abs(decayed) < MIN_SCORE, 0.0), else_=decayed))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        updated += result.rowcount
+
+    return updated
+
+
+def utc_now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def claim_decay_interval(db, now):
+    """Move the stored decay time to `now`, returning the seconds claimed (0 if nothing to do)
+
+    The conditional UPDATE means that when several workers run the job, each
+    stretch of time is decayed by exactly one of them.
+    """
+    state = db.get(HotDecayState, 1)
+    if state is None:
+        # First run ever: start the clock, there's no earlier time to decay from
+        try:
+            db.add(HotDecayState(id=1, decayed_at=now))
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+        return 0.0
+
+    previous = state.decayed_at
+    if now <= previous:
+        return 0.0
+    claimed = db.execute(
+        update(HotDecayState)
+        .where(HotDecayState.id == 1, HotDecayState.decayed_at == previous)
+        .values(decayed_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return (now - previous).total_seconds() if claimed else 0.0
+
+
+def run_hot_decay(now=None):
+    """Decay by the wall-clock time since the last recorded run, including any downtime"""
+    db = SessionLocal()
+    try:
+        elapsed = claim_decay_interval(db, now or utc_now())
+        if elapsed <= 0:
+            return 0
+        return decay_hot_scores(db, elapsed)
+    finally:
+        db.close()
+
+
+async def hot_decay_loop(interval=HOT_DECAY_INTERVAL_SECONDS):
+    """Background task started from the app lifespan, catches up on downtime first"""
+    while True:
+        try:
+            await asyncio.to_thread(run_hot_decay)
+        except Exception as e:
+            print(f"Hot score decay failed: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,14 @@
+import random
+
+# Weighted Rarity Selection:
+# Common: 70%, Uncommon: 15%, Rare: 8%, Epic: 6%, Legendary: 1%
+RARITY_WEIGHTS = {'Common': 70, 'Uncommon': 15, 'Rare': 8, 'Epic': 6, 'Legendary': 1}
+
+
+def get_random_rarity(rng=random):
+    rand = rng.random() * 100
+    if rand < 70: return 'Common'
+    elif rand < 85: return 'Uncommon'
+    elif rand < 93: return 'Rare'
+    elif rand < 99: return 'Epic'
+    else: return 'Legendary'
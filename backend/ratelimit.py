@@ -0,0 +1,231 @@
+"""Per-client token-bucket rate limiting for the inference and gallery write paths"""
+
+import hashlib
+import math
+import os
+import time
+import json
+from urllib.parse import parse_qs
+
+
+class RateLimit:
+    """A token bucket (refill `rate` tokens/sec up to `burst`) applied to matching requests.
+
+    `cost(scope)` gives the tokens a request takes (default 1), so batched
+    requests can pay for the work they do. It is capped at `burst` so even the
+    largest request gets through once the bucket is full.
+    """
+
+    def __init__(self, name, rate, burst, methods, path_prefix, cost=None, path_suffix=""):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.methods = set(methods)
+        self.path_prefix = path_prefix
+        self.path_suffix = path_suffix
+        self.cost = cost
+
+    def matches(self, method, path):
+        return method in self.methods and path.startswith(self.path_prefix) and path.endswith(self.path_suffix)
+
+    def tokens_for(self, scope):
+        return min(self.cost(scope), self.burst) if self.cost else 1
+
+
+class InMemoryBucketStore:
+    """Process-local bucket store, fine for a single uvicorn worker"""
+
+    def __init__(self, max_keys=100_000, clock=time.monotonic):
+        self.buckets = {}  # key -> (tokens, last_refill, full_at)
+        self.max_keys = max_keys
+        self.clock = clock
+
+    async def take(self, key, rate, burst, cost=1):
+        """Take `cost` tokens, returns 0 if allowed or the seconds to wait until there are enough"""
+        now = self.clock()
+        tokens, last, _ = self.buckets.get(key, (burst, now, now))
+        tokens = min(burst, tokens + (now - last) * rate)
+
+        if tokens >= cost:
+            wait = 0.0
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / rate
+
+        if key not in self.buckets and len(self.buckets) >= self.max_keys:
+            self.prune(now)
+        self.buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+        return wait
+
+    def prune(self, now):
+        # Buckets that have refilled completely behave exactly like missing ones
+        for key, (_, _, full_at) in list(self.buckets.items()):
+            if full_at <= now:
+                del self.buckets[key]
+
+
+# Refill and take atomically inside Redis so every app instance shares one bucket per client
+REDIS_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + (now - ts) * rate)
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBucketStore:
+    """Shared bucket store so limits hold across workers and instances"""
+
+    def __init__(self, client, prefix="ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self.script = client.register_script(REDIS_TAKE_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url):
+        # Optional dependency: only needed when a shared store is configured
+        import redis.asyncio as redis
+        return cls(redis.from_url(url))
+
+    async def take(self, key, rate, burst, cost=1):
+        wait = await self.script(keys=[self.prefix + key], args=[rate, burst, cost])
+        return float(wait)
+
+
+def query_params(scope):
+    """Query string as {name: last value}, for cost functions"""
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return {name: values[-1] for name, values in query.items()}
+
+
+def client_ip(scope, trusted_proxy_hops=0):
+    """The caller's IP, looking through exactly `trusted_proxy_hops` proxies we control.
+
+    Each trusted proxy appends the address it received the request from to
+    X-Forwarded-For, so the real client is `trusted_proxy_hops` entries from the
+    right. Anything further left was written by the client and can't be trusted.
+    """
+    client = scope.get("client")
+    peer = client[0] if client else "unknown"
+    if trusted_proxy_hops <= 0:
+        return peer
+
+    forwarded = [
+        value.decode("latin-1")
+        for name, value in scope.get("headers", [])
+        if name == b"x-forwarded-for"
+    ]
+    hops = [hop.strip() for hop in ",".join(forwarded).split(",") if hop.strip()]
+    if not hops:
+        return peer
+    return hops[-min(trusted_proxy_hops, len(hops))]
+
+
+def client_key(scope, api_keys=frozenset(), trusted_proxy_hops=0):
+    """Identify the caller by a configured API key when given, otherwise by client IP"""
+    for name, value in scope.get("headers", []):
+        if name == b"x-api-key" and value:
+            key = value.decode("latin-1")
+            # Unknown keys would let a client mint a fresh bucket per request, so they count as anonymous
+            if key in api_keys:
+                return "key:" + hashlib.sha256(value).hexdigest()[:16]
+            break
+    return "ip:" + client_ip(scope, trusted_proxy_hops)
+
+
+class RateLimitMiddleware:
+    """ASGI middleware answering over-limit clients with 429 + Retry-After"""
+
+    def __init__(self, app, limits, store=None, enabled=True, api_keys=frozenset(), trusted_proxy_hops=0):
+        self.app = app
+        self.limits = limits
+        self.store = store or InMemoryBucketStore()
+        self.enabled = enabled
+        self.api_keys = frozenset(api_keys)
+        self.trusted_proxy_hops = trusted_proxy_hops
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        limit = next((l for l in self.limits if l.matches(scope["method"], scope["path"])), None)
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        key = client_key(scope, self.api_keys, self.trusted_proxy_hops)
+        wait = await self.store.take(f"{limit.name}:{key}", limit.rate, limit.burst, limit.tokens_for(scope))
+        if wait <= 0:
+            return await self.app(scope, receive, send)
+
+        body = json.dumps({"detail": "Rate limit exceeded, try again later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(math.ceil(wait)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def limits_from_env(generate_cost=None):
+    """Generation, gallery-write, card-image and gallery-read limits, configured as tokens per minute + burst.
+
+    `generate_cost(scope)` prices generation requests in tokens (one per request by default).
+    """
+    generate_per_min = float(os.getenv("RATE_LIMIT_GENERATE_PER_MIN", "30"))
+    gallery_write_per_min = float(os.getenv("RATE_LIMIT_GALLERY_WRITE_PER_MIN", "60"))
+    gallery_read_per_min = float(os.getenv("RATE_LIMIT_GALLERY_READ_PER_MIN", "120"))
+    card_image_per_min = float(os.getenv("RATE_LIMIT_CARD_IMAGE_PER_MIN", "600"))
+
+    return [
+        RateLimit("generate", generate_per_min / 60, int(os.getenv("RATE_LIMIT_GENERATE_BURST", "10")),
+                  methods=["GET"], path_prefix="/api/card/", cost=generate_cost),
+        RateLimit("gallery_write", gallery_write_per_min / 60, int(os.getenv("RATE_LIMIT_GALLERY_WRITE_BURST", "20")),
+                  methods=["POST"], path_prefix="/api/gallery"),
+        # One page can hold dozens of <img> tags and CDNs pull from a few IPs, so card images get a
+        # much larger burst than page reads (each one is at most a single-card render). Checked first.
+        RateLimit("card_image", card_image_per_min / 60, int(os.getenv("RATE_LIMIT_CARD_IMAGE_BURST", "200")),
+                  methods=["GET"], path_prefix="/api/gallery/", path_suffix="/image"),
+        # Cold gallery pages render seed-only cards through netG, so reads are metered too
+        RateLimit("gallery_read", gallery_read_per_min / 60, int(os.getenv("RATE_LIMIT_GALLERY_READ_BURST", "30")),
+                  methods=["GET"], path_prefix="/api/gallery"),
+    ]
+
+
+def api_keys_from_env():
+    """API keys that get their own buckets (RATE_LIMIT_API_KEYS, comma separated)"""
+    return frozenset(key.strip() for key in os.getenv("RATE_LIMIT_API_KEYS", "").split(",") if key.strip())
+
+
+def trusted_proxy_hops_from_env():
+    """Number of our own proxies in front of the app (1 on Render), 0 to use the socket peer"""
+    return int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+
+
+def store_from_env():
+    """In-memory by default, Redis when RATE_LIMIT_STORAGE_URL is set"""
+    url = os.getenv("RATE_LIMIT_STORAGE_URL")
+    if url:
+        return RedisBucketStore.from_url(url)
+    return InMemoryBucketStore()
+
+
+def rate_limiting_enabled():
+    return os.getenv("RATE_LIMIT_ENABLED", "true").lower() not in ("0", "false", "no")
@@ -0,0 +1,180 @@
+"""Checkpoint registry: load generators by name on demand, keep them in an LRU
+bounded by a memory budget, and hot-swap the default without a restart.
+
+Requests grab a LoadedModel reference once and use it until they finish, so
+swapping the default or evicting a model never pulls weights out from under
+an in-flight request; the old model is freed when its last user is done.
+
+Names are just file stems and a file can be replaced in place, so every loaded
+model also carries a version: the sha256 of its checkpoint file. Anything that
+must keep looking the same (seed-only gallery cards, ETags) records the version.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from inference import load_models
+
+CHECKPOINT_DIR = Path(os.getenv("CHECKPOINT_DIR", "checkpoints"))
+DEFAULT_MODEL = os.getenv("DEFAULT_MODEL", "gan_checkpoint")
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "512"))
+
+MODEL_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+class ModelNotFound(KeyError):
+    pass
+
+
+def module_bytes(module):
+    if module is None:
+        return 0
+    tensors = list(module.parameters()) + list(module.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class LoadedModel:
+    def __init__(self, name, netG, netD, version=None):
+        self.name = name
+        self.netG = netG
+        self.netD = netD
+        self.version = version
+        self.size_bytes = module_bytes(netG) + module_bytes(netD)
+        self.loaded_at = time.time()
+
+
+class ModelRegistry:
+    def __init__(self, device, checkpoint_dir=CHECKPOINT_DIR, default_name=DEFAULT_MODEL,
+                 memory_budget_bytes=MODEL_MEMORY_BUDGET_MB * 1024 * 1024, loader=load_models, on_load=None):
+        self.device = device
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.default_name = default_name
+        self.memory_budget_bytes = memory_budget_bytes
+        self.loader = loader
+        self.on_load = on_load  # e.g. apply the autotuned memory format to new models
+        self.models = OrderedDict()  # name -> LoadedModel, least recently used first
+        self.lock = threading.Lock()
+        self.load_locks = {}  # name -> lock, so concurrent requests load a checkpoint once
+        self.versions = {}  # path -> ((size, mtime), sha256), so unchanged files are hashed once
+
+    def path_for(self, name):
+        if not MODEL_NAME_PATTERN.match(name):
+            raise ModelNotFound(name)
+        path = self.checkpoint_dir / f"{name}.pth"
+        if not path.is_file():
+            raise ModelNotFound(name)
+        return path
+
+    def available(self):
+        return sorted(path.stem for path in self.checkpoint_dir.glob("*.pth"))
+
+    def get(self, name=None):
+        """The named model (default when None), loading it on first use"""
+        name = name or self.default_name
+        with self.lock:
+            model = self.models.get(name)
+            if model is not None:
+                self.models.move_to_end(name)
+                return model
+
+        # Unknown names fail here, before they can leave a load lock behind
+        path = self.path_for(name)
+        with self.lock:
+            load_lock = self.load_locks.setdefault(name, threading.Lock())
+
+        # Load outside the registry lock so cached models keep serving meanwhile
+        with load_lock:
+            with self.lock:
+                if name in self.models:
+                    self.models.move_to_end(name)
+                    return self.models[name]
+
+            version = self.file_version(path)
+            netG, netD = self.loader(path, self.device)
+            model = LoadedModel(name, netG, netD, version)
+            if self.on_load:
+                self.on_load(model)
+
+            with self.lock:
+                self.models[name] = model
+                self._evict()
+            return model
+
+    def file_version(self, path):
+        """Content hash of a checkpoint file, recomputed only when the file changes"""
+        stat = path.stat()
+        key = (stat.st_size, stat.st_mtime_ns)
+        cached = self.versions.get(path)
+        if cached is None or cached[0] != key:
+            cached = (key, file_sha256(path))
+            self.versions[path] = cached
+        return cached[1]
+
+    def get_version(self, name, version=None):
+        """The model that produced `version`: `name` if it still matches, else any checkpoint with that hash"""
+        try:
+            model = self.get(name)
+            if version is None or model.version == version:
+                return model
+        except ModelNotFound:
+            if version is None:
+                raise
+
+        # e.g. the old checkpoint was kept under another name after retraining
+        for candidate in self.available():
+            if candidate != name and self.file_version(self.path_for(candidate)) == version:
+                model = self.get(candidate)
+                if model.version == version:
+                    return model
+        raise ModelNotFound(f"{name}@{version[:12]}")
+
+    def _evict(self):
+        # Drop least recently used models (never the default or the newest) until under budget
+        while self.total_bytes() > self.memory_budget_bytes:
+            victim = next((n for n in self.models if n != self.default_name and n != next(reversed(self.models))), None)
+            if victim is None:
+                break
+            del self.models[victim]
+            print(f"Evicted model {victim} (memory budget)")
+
+    def total_bytes(self):
+        return sum(model.size_bytes for model in self.models.values())
+
+    def set_default(self, name, prepare=None):
+        """Load (and optionally warm) `name` first, then swap it in as the default in one step"""
+        model = self.get(name)
+        if prepare:
+            prepare(model)
+        with self.lock:
+            previous = self.default_name
+            self.default_name = name
+            self._evict()
+        return previous
+
+    def status(self):
+        with self.lock:
+            return {
+                "default": self.default_name,
+                "available": self.available(),
+                "loaded": [
+                    {"name": model.name, "version": model.version,
+                     "size_mb": round(model.size_bytes / 1024 / 1024, 2),
+                     "has_discriminator": model.netD is not None}
+                    for model in self.models.values()
+                ],
+                "memory_used_mb": round(self.total_bytes() / 1024 / 1024, 2),
+                "memory_budget_mb": round(self.memory_budget_bytes / 1024 / 1024, 2),
+            }
@@ -0,0 +1,95 @@
+"""On-demand rendering of seed-only gallery cards.
+
+Cards shared from our own generator are stored as (seed, model, model version)
+instead of a PNG, since the image is a deterministic function of the seed and
+the checkpoint's weights. The version (the checkpoint's sha256) makes sure a
+card is only ever rendered by the exact weights it was shared with.
+
+Reads turn them back into PNGs here: cache misses for a whole gallery page are
+grouped by model and generated in netG batches, and the encoded PNGs are kept
+in an LRU so popular cards are only ever rendered once per process. At most
+RENDER_CONCURRENCY batches run at a time, so a crawler walking cold gallery
+pages queues up behind them instead of taking every core.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import torch
+
+from inference import seed_latents, tensors_to_images
+from ingest import canonical_png
+from registry import ModelNotFound
+
+RENDER_CACHE_SIZE = int(os.getenv("RENDER_CACHE_SIZE", "2048"))
+RENDER_BATCH_SIZE = int(os.getenv("RENDER_BATCH_SIZE", "32"))
+RENDER_CONCURRENCY = int(os.getenv("RENDER_CONCURRENCY", "2"))
+
+
+class CardRenderer:
+    def __init__(self, registry, cache_size=RENDER_CACHE_SIZE, batch_size=RENDER_BATCH_SIZE,
+                 concurrency=RENDER_CONCURRENCY):
+        self.registry = registry
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        # Also held by best-of-N and evolution renders in app.py, so all batched netG work shares one bound
+        self.render_slots = threading.BoundedSemaphore(concurrency)
+        self.cache = OrderedDict()  # (model, version, seed) -> base64 PNG, least recently used first
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self, key):
+        with self.lock:
+            image = self.cache.get(key)
+            if image is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.cache.move_to_end(key)
+            return image
+
+    def _store(self, key, image):
+        with self.lock:
+            self.cache[key] = image
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def render_many(self, keys):
+        """{(model, version, seed): base64 PNG} for every key whose exact checkpoint is still available"""
+        images = {}
+        missing = {}  # (model, version) -> seeds
+        for key in dict.fromkeys(keys):
+            image = self._cached(key)
+            if image is None:
+                missing.setdefault(key[:2], []).append(key[2])
+            else:
+                images[key] = image
+
+        for (model_name, version), seeds in missing.items():
+            try:
+                model = self.registry.get_version(model_name, version)
+            except ModelNotFound:
+                print(f"Cannot render {len(seeds)} cards: model {model_name} ({version}) is not available")
+                continue
+
+            for start in range(0, len(seeds), self.batch_size):
+                chunk = seeds[start:start + self.batch_size]
+                with self.render_slots, torch.no_grad():
+                    fake_images = model.netG(seed_latents(chunk, self.registry.device))
+                for seed, img in zip(chunk, tensors_to_images(fake_images)):
+                    image = canonical_png(img)
+                    self._store((model_name, version, seed), image)
+                    images[(model_name, version, seed)] = image
+
+        return images
+
+    def render(self, model_name, version, seed):
+        key = (model_name, version, seed)
+        return self.render_many([key]).get(key)
+
+    def stats(self):
+        with self.lock:
+            return {"cached": len(self.cache), "hits": self.hits, "misses": self.misses}
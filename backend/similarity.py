@@ -0,0 +1,129 @@
+"""In-memory cosine-similarity index over card latent vectors.
+
+Latents live in one contiguous float32 matrix (unit-normalized rows), so a
+"more like this" query is a single matrix-vector product plus argpartition,
+with no database scan. The index is built once at startup and updated
+incrementally as cards are shared.
+"""
+
+import threading
+
+import numpy as np
+from sqlalchemy import select
+
+from database import GeneratedCard
+from models import nz
+
+
+def latent_to_bytes(latent):
+    """Flatten a latent tensor/array into the bytes stored in GeneratedCard.latent"""
+    if hasattr(latent, "detach"):
+        latent = latent.detach().cpu().numpy()
+    return np.asarray(latent, dtype=np.float32).reshape(-1).tobytes()
+
+
+def latent_from_bytes(data):
+    return np.frombuffer(data, dtype=np.float32)
+
+
+class LatentIndex:
+    def __init__(self, dim=nz, capacity=1024):
+        self.dim = dim
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.vectors = np.empty((capacity, dim), dtype=np.float32)
+        self.size = 0
+        self.positions = {}  # card id -> row in self.vectors
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self, needed):
+        capacity = len(self.ids)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        ids = np.empty(capacity, dtype=np.int64)
+        vectors = np.empty((capacity, self.dim), dtype=np.float32)
+        ids[:self.size] = self.ids[:self.size]
+        vectors[:self.size] = self.vectors[:self.size]
+        self.ids, self.vectors = ids, vectors
+
+    @staticmethod
+    def _normalize(vectors):
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def add_many(self, card_ids, latents):
+        """Insert or replace many cards at once (vectorized normalization)"""
+        latents = self._normalize(np.asarray(latents, dtype=np.float32).reshape(len(card_ids), self.dim))
+        with self.lock:
+            self._grow(self.size + len(card_ids))
+            for card_id, vector in zip(card_ids, latents):
+                row = self.positions.get(card_id)
+                if row is None:
+                    row = self.size
+                    self.size += 1
+                    self.positions[card_id] = row
+                    self.ids[row] = card_id
+                self.vectors[row] = vector
+
+    def add(self, card_id, latent):
+        self.add_many([card_id], [latent])
+
+    def remove(self, card_id):
+        with self.lock:
+            row = self.positions.pop(card_id, None)
+            if row is None:
+                return
+            # Keep rows contiguous: move the last row into the hole
+            last = self.size - 1
+            if row != last:
+                self.ids[row] = self.ids[last]
+                self.vectors[row] = self.vectors[last]
+                self.positions[int(self.ids[row])] = row
+            self.size = last
+
+    def clear(self):
+        with self.lock:
+            self.size = 0
+            self.positions = {}
+
+    def get(self, card_id):
+        with self.lock:
+            row = self.positions.get(card_id)
+            return None if row is None else self.vectors[row].copy()
+
+    def query(self, latent, k=10, exclude_id=None):
+        """Top-k (card id, cosine similarity) pairs, best first"""
+        query = self._normalize(np.asarray(latent, dtype=np.float32).reshape(self.dim))
+
+        with self.lock:
+            scores = self.vectors[:self.size] @ query
+            ids = self.ids[:self.size].copy()
+
+        if exclude_id is not None:
+            scores[ids == exclude_id] = -np.inf
+
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+
+        # O(n) selection of the top k, then sort just those
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+
+def build_index(index, db, batch_size=5000):
+    """(Re)load every stored latent into the index, one yield_per batch at a time"""
+    index.clear()
+    stmt = (
+        select(GeneratedCard.id, GeneratedCard.latent)
+        .where(GeneratedCard.latent.isnot(None))
+        .execution_options(yield_per=batch_size)
+    )
+    for partition in db.execute(stmt).partitions():
+        index.add_many([row.id for row in partition], [latent_from_bytes(row.latent) for row in partition])
+    return len(index)
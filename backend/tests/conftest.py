@@ -1,15 +1,28 @@
 """Pytest configuration and fixtures for testing"""
 
+import base64
 import os
 import sys
+import tempfile
+from pathlib import Path
+from io import BytesIO
 from unittest.mock import patch
 import pytest
+from PIL import Image
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 os.environ["TESTING"] = "true"
 os.environ["DATABASE_URL"] = "sqlite:///./test.db"  # File-based SQLite for tests
+os.environ["RATE_LIMIT_ENABLED"] = "false"  # Rate limiting has its own tests in test_ratelimit.py
+os.environ["WARMUP_BATCH_SIZES"] = "1"  # Full warm-up on every TestClient start would dominate test time
+
+# Empty checkpoint files for the model registry to find (torch.load is mocked below)
+CHECKPOINT_DIR = tempfile.mkdtemp(prefix="checkpoints-")
+for name in ("gan_checkpoint", "alt"):
+    Path(CHECKPOINT_DIR, f"{name}.pth").touch()
+os.environ["CHECKPOINT_DIR"] = CHECKPOINT_DIR
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -19,17 +32,21 @@ def mock_pytorch_model():
     This prevents loading the 78MB model checkpoint during test
     """
 
-    # Import Generator to get its structure
-    from models import Generator
+    # Import Generator and Discriminator to get their structure
+    from models import Generator, Discriminator
     import torch
 
-    # Create a real generator to get the proper state_dict structure
+    # Create real networks to get the proper state_dict structure
     temp_gen = Generator(ngpu=0)
     real_state_dict = temp_gen.state_dict()
+    temp_disc = Discriminator(ngpu=0)
 
     # Mock torch.load to return a proper checkpoint with real keys but zero values
     with patch('torch.load') as mock_load:
-        mock_load.return_value = {'generator_state_dict': real_state_dict}
+        mock_load.return_value = {
+            'generator_state_dict': real_state_dict,
+            'discriminator_state_dict': temp_disc.state_dict()
+        }
         yield
 
 
@@ -53,3 +70,11 @@ def client():
 
     # Clean up: drop all tables after tests
     Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def card_image():
+    """Base64 PNG with the generator's 64x96 RGB shape, as the frontend shares it"""
+    buffered = BytesIO()
+    Image.new("RGB", (64, 96), (200, 30, 30)).save(buffered, format="PNG")
+    return base64.b64encode(buffered.getvalue()).decode()
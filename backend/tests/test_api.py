@@ -1,4 +1,5 @@
 import base64
+import math
 from io import BytesIO
 from PIL import Image
 
@@ -20,6 +21,37 @@ def test_root_endpoint_returns_correct_data(client):
     assert data == {"status": "online"}
 
 
+def test_liveness_probe(client):
+    """Test that the liveness probe always answers."""
+    response = client.get("/health/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive"}
+
+
+def test_readiness_probe_reports_warmup(client):
+    """Test that the app is ready after startup and reports warm-up durations."""
+    response = client.get("/health/ready")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data["status"] == "ready"
+    assert data["warmup"]["db_connections"] >= 1
+    assert "1" in data["warmup"]["model_warmup_ms"]
+    assert data["warmup"]["total_ms"] >= data["warmup"]["model_load_ms"]
+
+
+def test_readiness_probe_fails_before_startup():
+    """Test that readiness is 503 until the lifespan warm-up has run."""
+    from fastapi.testclient import TestClient
+    import app as app_module
+
+    app_module.readiness["ready"] = False
+    # No context manager: lifespan (and so warm-up) never runs
+    response = TestClient(app_module.app).get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming_up"
+
+
 # ============================================================================
 # Card Generation Endpoint
 # ============================================================================
@@ -96,6 +128,17 @@ def test_generate_card_creates_unique_images(client):
     assert data1["image"] != data2["image"]
 
 
+def test_inference_config_reports_settings(client):
+    """Test that the inference settings in use are exposed."""
+    response = client.get("/api/inference/config")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data["batch_size"] >= 1
+    assert data["num_threads"] >= 1
+    assert data["memory_format"] in ["contiguous", "channels_last"]
+
+
 # ============================================================================
 # Gallery - Get Cards
 # ============================================================================
@@ -132,12 +175,12 @@ def test_gallery_empty_initially(client):
     assert data["has_more"] is False
 
 
-def test_gallery_sort_by_popular(client):
+def test_gallery_sort_by_popular(client, card_image):
     """Test that popular sort returns cards sorted by upvotes."""
     # Share three cards with different upvote counts
-    client.post("/api/gallery/share", json={"image_data": "image1"})
-    client.post("/api/gallery/share", json={"image_data": "image2"})
-    client.post("/api/gallery/share", json={"image_data": "image3"})
+    client.post("/api/gallery/share", json={"image_data": card_image})
+    client.post("/api/gallery/share", json={"image_data": card_image})
+    client.post("/api/gallery/share", json={"image_data": card_image})
 
     # Upvote cards different amounts
     client.post("/api/gallery/1/upvote")
@@ -159,12 +202,12 @@ def test_gallery_sort_by_popular(client):
     assert data["cards"][2]["upvotes"] == 0
 
 
-def test_gallery_sort_by_recent(client):
+def test_gallery_sort_by_recent(client, card_image):
     """Test that recent sort returns cards by creation date."""
     # Share three cards (most recent last)
-    response1 = client.post("/api/gallery/share", json={"image_data": "image1"})
-    response2 = client.post("/api/gallery/share", json={"image_data": "image2"})
-    response3 = client.post("/api/gallery/share", json={"image_data": "image3"})
+    response1 = client.post("/api/gallery/share", json={"image_data": card_image})
+    response2 = client.post("/api/gallery/share", json={"image_data": card_image})
+    response3 = client.post("/api/gallery/share", json={"image_data": card_image})
 
     # Get gallery sorted by recent
     response = client.get("/api/gallery?sort_by=recent")
@@ -178,17 +221,33 @@ def test_gallery_sort_by_recent(client):
     assert data["cards"][2]["id"] == 1
 
 
+def test_gallery_sort_by_hot(client, card_image):
+    """Test that hot sort ranks by decayed score, newest first on ties."""
+    client.post("/api/gallery/share", json={"image_data": card_image})
+    client.post("/api/gallery/share", json={"image_data": card_image})
+    client.post("/api/gallery/share", json={"image_data": card_image})
+
+    client.post("/api/gallery/1/upvote")
+    client.post("/api/gallery/1/upvote")  # Card 1: share score + 2
+    client.post("/api/gallery/2/downvote")  # Card 2: share score - 1
+
+    response = client.get("/api/gallery?sort_by=hot")
+    data = response.json()
+
+    assert [card["id"] for card in data["cards"]] == [1, 3, 2]
+
+
 def test_gallery_invalid_sort_returns_400(client):
     """Test that invalid sort parameter returns 400 error."""
     response = client.get("/api/gallery?sort_by=invalid")
     assert response.status_code == 400
 
 
-def test_gallery_pagination(client):
+def test_gallery_pagination(client, card_image):
     """Test that pagination works correctly."""
     # Create 15 cards
     for i in range(15):
-        client.post("/api/gallery/share", json={"image_data": f"image{i}"})
+        client.post("/api/gallery/share", json={"image_data": card_image})
 
     # Get first page (limit 10)
     response = client.get("/api/gallery?page=1&limit=10")
@@ -219,15 +278,15 @@ def test_gallery_limit_capped_at_100(client):
 # Gallery - Share Card
 # ============================================================================
 
-def test_share_card_returns_200(client):
+def test_share_card_returns_200(client, card_image):
     """Test that sharing a card returns 200 status code."""
-    response = client.post("/api/gallery/share", json={"image_data": "test_image"})
+    response = client.post("/api/gallery/share", json={"image_data": card_image})
     assert response.status_code == 200
 
 
-def test_share_card_returns_correct_structure(client):
+def test_share_card_returns_correct_structure(client, card_image):
     """Test that share endpoint returns correct response structure."""
-    response = client.post("/api/gallery/share", json={"image_data": "test_image"})
+    response = client.post("/api/gallery/share", json={"image_data": card_image})
     data = response.json()
 
     assert "id" in data
@@ -237,18 +296,18 @@ def test_share_card_returns_correct_structure(client):
     assert "message" in data
 
 
-def test_share_card_starts_with_zero_upvotes(client):
+def test_share_card_starts_with_zero_upvotes(client, card_image):
     """Test that newly shared cards start with 0 upvotes."""
-    response = client.post("/api/gallery/share", json={"image_data": "test_image"})
+    response = client.post("/api/gallery/share", json={"image_data": card_image})
     data = response.json()
 
     assert data["upvotes"] == 0
 
 
-def test_share_card_appears_in_gallery(client):
+def test_share_card_appears_in_gallery(client, card_image):
     """Test that shared card appears in gallery."""
     # Share a card
-    share_response = client.post("/api/gallery/share", json={"image_data": "my_test_card"})
+    share_response = client.post("/api/gallery/share", json={"image_data": card_image})
     card_id = share_response.json()["id"]
 
     # Get gallery
@@ -264,10 +323,10 @@ def test_share_card_appears_in_gallery(client):
 # Gallery - Voting
 # ============================================================================
 
-def test_upvote_card_returns_200(client):
+def test_upvote_card_returns_200(client, card_image):
     """Test that upvoting a card returns 200 status code."""
     # Create a card first
-    response = client.post("/api/gallery/share", json={"image_data": "test"})
+    response = client.post("/api/gallery/share", json={"image_data": card_image})
     card_id = response.json()["id"]
 
     # Upvote it
@@ -275,10 +334,10 @@ def test_upvote_card_returns_200(client):
     assert upvote_response.status_code == 200
 
 
-def test_upvote_card_increments_count(client):
+def test_upvote_card_increments_count(client, card_image):
     """Test that upvoting increases upvote count."""
     # Create a card
-    response = client.post("/api/gallery/share", json={"image_data": "test"})
+    response = client.post("/api/gallery/share", json={"image_data": card_image})
     card_id = response.json()["id"]
 
     # Upvote it
@@ -289,10 +348,10 @@ def test_upvote_card_increments_count(client):
     assert upvote_data["new_upvote_count"] == 1
 
 
-def test_upvote_card_multiple_times(client):
+def test_upvote_card_multiple_times(client, card_image):
     """Test that a card can be upvoted multiple times."""
     # Create a card
-    response = client.post("/api/gallery/share", json={"image_data": "test"})
+    response = client.post("/api/gallery/share", json={"image_data": card_image})
     card_id = response.json()["id"]
 
     # Upvote 3 times
@@ -302,10 +361,10 @@ def test_upvote_card_multiple_times(client):
         assert data["new_upvote_count"] == i + 1
 
 
-def test_downvote_card_returns_200(client):
+def test_downvote_card_returns_200(client, card_image):
     """Test that downvoting a card returns 200 status code."""
     # Create a card first
-    response = client.post("/api/gallery/share", json={"image_data": "test"})
+    response = client.post("/api/gallery/share", json={"image_data": card_image})
     card_id = response.json()["id"]
 
     # Downvote it
@@ -313,10 +372,10 @@ def test_downvote_card_returns_200(client):
     assert downvote_response.status_code == 200
 
 
-def test_downvote_card_decrements_count(client):
+def test_downvote_card_decrements_count(client, card_image):
     """Test that downvoting decreases upvote count."""
     # Create a card
-    response = client.post("/api/gallery/share", json={"image_data": "test"})
+    response = client.post("/api/gallery/share", json={"image_data": card_image})
     card_id = response.json()["id"]
 
     # Downvote it
@@ -339,10 +398,10 @@ def test_downvote_nonexistent_card_returns_404(client):
     assert response.status_code == 404
 
 
-def test_vote_card_can_go_negative(client):
+def test_vote_card_can_go_negative(client, card_image):
     """Test that vote counts can go negative."""
     # Create a card
-    response = client.post("/api/gallery/share", json={"image_data": "test"})
+    response = client.post("/api/gallery/share", json={"image_data": card_image})
     card_id = response.json()["id"]
 
     # Downvote 5 times
@@ -354,3 +413,261 @@ def test_vote_card_can_go_negative(client):
     cards = gallery_response.json()["cards"]
 
     assert cards[0]["upvotes"] == -5
+
+
+# ============================================================================
+# Card Evolution (Latent Interpolation) Endpoint
+# ============================================================================
+
+def test_evolve_card_returns_animated_webp(client):
+    """Test that evolve endpoint returns a WebP card-sized animation."""
+    response = client.get("/api/card/evolve?seed_a=1&seed_b=2&frames=8")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+
+    img = Image.open(BytesIO(response.content))
+    assert img.format == "WEBP"
+    assert img.size == (64, 96)
+
+
+def test_evolve_card_gif_slerp(client):
+    """Test that evolve endpoint supports GIF output and slerp interpolation."""
+    response = client.get("/api/card/evolve?seed_a=3&seed_b=4&frames=5&mode=slerp&format=gif")
+    assert response.status_code == 200
+
+    img = Image.open(BytesIO(response.content))
+    assert img.format == "GIF"
+
+
+def test_evolve_card_is_deterministic(client):
+    """Test that the same seeds produce the same animation."""
+    response1 = client.get("/api/card/evolve?seed_a=5&seed_b=6&frames=4")
+    response2 = client.get("/api/card/evolve?seed_a=5&seed_b=6&frames=4")
+    assert response1.content == response2.content
+
+
+def test_evolve_card_invalid_params_return_400(client):
+    """Test that bad frame counts, modes and formats are rejected."""
+    assert client.get("/api/card/evolve?seed_a=1&seed_b=2&frames=1").status_code == 400
+    assert client.get("/api/card/evolve?seed_a=1&seed_b=2&frames=1000").status_code == 400
+    assert client.get("/api/card/evolve?seed_a=1&seed_b=2&mode=cubic").status_code == 400
+    assert client.get("/api/card/evolve?seed_a=1&seed_b=2&format=bmp").status_code == 400
+    assert client.get("/api/card/evolve?seed_a=-1&seed_b=2").status_code == 400
+
+
+# ============================================================================
+# HTTP Conditional Caching
+# ============================================================================
+
+def test_gallery_returns_etag_and_304(client, card_image):
+    """Test that an unchanged gallery page is answered with 304."""
+    client.post("/api/gallery/share", json={"image_data": card_image})
+
+    response = client.get("/api/gallery")
+    etag = response.headers["etag"]
+    assert "must-revalidate" in response.headers["cache-control"]
+
+    cached = client.get("/api/gallery", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+def test_gallery_etag_changes_only_for_affected_pages(client, card_image):
+    """Test that a vote invalidates the page holding the card but not other pages."""
+    for i in range(4):
+        client.post("/api/gallery/share", json={"image_data": card_image})
+
+    page1 = client.get("/api/gallery?sort_by=recent&limit=2&page=1").headers["etag"]
+    page2 = client.get("/api/gallery?sort_by=recent&limit=2&page=2").headers["etag"]
+
+    # Card 1 is the oldest, so it lives on page 2 of the recent sort
+    client.post("/api/gallery/1/upvote")
+
+    assert client.get("/api/gallery?sort_by=recent&limit=2&page=1", headers={"If-None-Match": page1}).status_code == 304
+    assert client.get("/api/gallery?sort_by=recent&limit=2&page=2", headers={"If-None-Match": page2}).status_code == 200
+
+
+def test_card_image_endpoint_serves_png_with_etag(client, card_image):
+    """Test that card images are served raw and revalidated with 304."""
+    card_id = client.post("/api/gallery/share", json={"image_data": card_image}).json()["id"]
+
+    response = client.get(f"/api/gallery/{card_id}/image")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert Image.open(BytesIO(response.content)).size == (64, 96)
+
+    # Votes don't change the image validator
+    client.post(f"/api/gallery/{card_id}/upvote")
+    cached = client.get(f"/api/gallery/{card_id}/image", headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+
+
+def test_card_image_nonexistent_returns_404(client):
+    """Test that requesting the image of a missing card returns 404."""
+    assert client.get("/api/gallery/9999/image").status_code == 404
+
+
+def test_card_image_with_corrupt_data_returns_404(client):
+    """Test that a stored image that isn't valid base64 is reported as unavailable, not a 500."""
+    from database import SessionLocal, GeneratedCard
+
+    db = SessionLocal()
+    try:
+        card = GeneratedCard(image_data="not an image", upvotes=0)
+        db.add(card)
+        db.commit()
+        card_id = card.id
+    finally:
+        db.close()
+
+    response = client.get(f"/api/gallery/{card_id}/image")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Card image unavailable"
+
+
+def test_generate_card_returns_seed(client):
+    """Test that random cards report the seed they were generated from."""
+    data = client.get("/api/card/generate").json()
+    assert isinstance(data["seed"], int)
+
+
+def test_seeded_generate_is_reproducible_and_cacheable(client):
+    """Test that seeded cards are deterministic and revalidate with 304."""
+    response1 = client.get("/api/card/generate?seed=42")
+    response2 = client.get("/api/card/generate?seed=42")
+    assert response1.json() == response2.json()
+
+    etag = response1.headers["etag"]
+    assert client.get("/api/card/generate?seed=42", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/api/card/generate?seed=43", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_unseeded_generate_is_not_cached(client):
+    """Test that random cards are never stored by caches."""
+    response = client.get("/api/card/generate")
+    assert response.headers["cache-control"] == "no-store"
+    assert "etag" not in response.headers
+
+
+def test_evolve_card_revalidates_with_304(client):
+    """Test that evolution animations carry an ETag and honour If-None-Match."""
+    response = client.get("/api/card/evolve?seed_a=1&seed_b=2&frames=4")
+    cached = client.get("/api/card/evolve?seed_a=1&seed_b=2&frames=4", headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+
+
+def test_evolve_is_charged_per_frame():
+    """Test that evolution requests take generate tokens in proportion to their frames."""
+    from app import generation_cost, IMAGES_PER_TOKEN, DEFAULT_EVOLUTION_FRAMES, MAX_EVOLUTION_FRAMES
+
+    def cost(query):
+        return generation_cost({"path": "/api/card/evolve", "query_string": query})
+
+    assert cost(b"seed_a=1&seed_b=2") == math.ceil(DEFAULT_EVOLUTION_FRAMES / IMAGES_PER_TOKEN)
+    assert cost(f"seed_a=1&seed_b=2&frames={MAX_EVOLUTION_FRAMES}".encode()) == math.ceil(MAX_EVOLUTION_FRAMES / IMAGES_PER_TOKEN)
+    assert cost(b"seed_a=1&seed_b=2&frames=2") == 1
+
+
+def test_list_models(client):
+    """Test that available checkpoints and the default are reported."""
+    data = client.get("/api/models").json()
+    assert data["default"] == "gan_checkpoint"
+    assert "alt" in data["available"]
+
+
+def test_generate_with_named_model(client):
+    """Test that ?model= selects a checkpoint and is part of the ETag."""
+    default = client.get("/api/card/generate?seed=42")
+    alt = client.get("/api/card/generate?seed=42&model=alt")
+    assert alt.status_code == 200
+    assert alt.json()["model"] == "alt"
+    assert alt.headers["etag"] != default.headers["etag"]
+
+    assert client.get("/api/card/generate?model=missing").status_code == 404
+    assert client.get("/api/card/evolve?seed_a=1&seed_b=2&model=missing").status_code == 404
+
+
+def test_admin_swaps_default_model(client, monkeypatch):
+    """Test that the default model can be switched at runtime."""
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    headers = {"X-Admin-Token": "secret"}
+
+    assert client.post("/api/admin/models/default", json={"name": "missing"}, headers=headers).status_code == 404
+    assert client.post("/api/admin/models/default", json={"name": ""}, headers=headers).status_code == 422
+    response = client.post("/api/admin/models/default", json={"name": "alt"}, headers=headers)
+    try:
+        assert response.status_code == 200
+        assert response.json()["previous"] == "gan_checkpoint"
+        assert client.get("/api/card/generate?seed=1").json()["model"] == "alt"
+    finally:
+        client.post("/api/admin/models/default", json={"name": "gan_checkpoint"}, headers=headers)
+
+
+def test_share_rejects_wrong_image(client):
+    """Test that share validates the image and the request shape."""
+    response = client.post("/api/gallery/share", json={"image_data": "not_an_image"})
+    assert response.status_code == 400
+    assert client.post("/api/gallery/share", json={}).status_code == 400
+    assert client.post("/api/gallery/share", json={"seed": "abc"}).status_code == 422
+
+
+def test_share_rejects_oversized_body(client, monkeypatch):
+    """Test that bodies over the byte cap get 413, even without Content-Length."""
+    import ingest
+    monkeypatch.setattr(ingest, "SHARE_MAX_BYTES", 1000)
+
+    response = client.post("/api/gallery/share", json={"image_data": "A" * 2000})
+    assert response.status_code == 413
+
+    chunks = (b"x" * 100 for _ in range(20))
+    response = client.post("/api/gallery/share", content=chunks, headers={"Content-Type": "application/json"})
+    assert response.status_code == 413
+
+
+def test_seed_only_share_is_rendered_on_read(client):
+    """Test that cards shared by seed store no image and are regenerated for the gallery."""
+    from database import SessionLocal, GeneratedCard
+
+    response = client.post("/api/gallery/share", json={"seed": 1234, "model": "alt"})
+    assert response.status_code == 200
+    card_id = response.json()["id"]
+    assert response.json()["image"].startswith("data:image/png;base64,")
+
+    db = SessionLocal()
+    try:
+        card = db.get(GeneratedCard, card_id)
+        assert (card.image_data, card.seed, card.model) == (None, 1234, "alt")
+        assert len(card.model_version) == 64  # sha256 of alt.pth
+    finally:
+        db.close()
+
+    gallery = client.get("/api/gallery").json()
+    assert gallery["cards"][0]["image"] == response.json()["image"]
+
+    image = client.get(f"/api/gallery/{card_id}/image")
+    assert Image.open(BytesIO(image.content)).size == (64, 96)
+
+    assert client.post("/api/gallery/share", json={"seed": 1, "model": "missing"}).status_code == 404
+
+
+def test_seeded_cache_lifetime_depends_on_pinned_version(client):
+    """Test that only URLs naming the checkpoint's sha256 get a long max-age."""
+    unpinned = client.get("/api/card/generate?seed=5")
+    version = unpinned.json()["version"]
+    assert unpinned.headers["cache-control"] == "public, no-cache"
+    # A name alone can point at a different file tomorrow
+    named = client.get("/api/card/generate?seed=5&model=gan_checkpoint")
+    assert named.headers["cache-control"] == "public, no-cache"
+
+    pinned = client.get(f"/api/card/generate?seed=5&model=gan_checkpoint&version={version}")
+    assert pinned.headers["cache-control"] == "public, max-age=86400"
+    assert pinned.json()["image"] == unpinned.json()["image"]
+    assert client.get("/api/card/generate?seed=5&version=" + "0" * 64).status_code == 404
+
+    evolve = client.get(f"/api/card/evolve?seed_a=1&seed_b=2&frames=2&version={version}")
+    assert evolve.headers["cache-control"] == "public, max-age=86400"
+
+    evolve = client.get("/api/card/evolve?seed_a=1&seed_b=2&frames=2")
+    assert evolve.headers["cache-control"] == "public, no-cache"
+    cached = client.get("/api/card/evolve?seed_a=1&seed_b=2&frames=2", headers={"If-None-Match": evolve.headers["etag"]})
+    assert cached.headers["cache-control"] == "public, no-cache"
@@ -0,0 +1,101 @@
+import json
+import pytest
+import torch
+from models import Generator
+import autotune
+from autotune import autotune as run_autotune, tune_or_load, host_signature
+
+
+@pytest.fixture(autouse=True)
+def restore_threads():
+    """Autotuning changes torch's global thread count, put it back for other tests"""
+    threads = torch.get_num_threads()
+    yield
+    torch.set_num_threads(threads)
+
+
+def small_grid():
+    return {"batch_sizes": [1, 2], "memory_formats": ["contiguous", "channels_last"], "threads": [1], "repeats": 1}
+
+
+def test_autotune_picks_best_throughput_within_budget():
+    """Test that the chosen configuration is the fastest one under the latency budget."""
+    netG = Generator(ngpu=0).eval()
+    settings = run_autotune(netG, torch.device("cpu"), latency_budget_ms=10_000, **small_grid())
+
+    assert len(settings["results"]) == 4
+    assert settings["throughput"] == max(r["throughput"] for r in settings["results"])
+    assert settings["source"] == "autotune"
+
+
+def test_autotune_falls_back_to_single_card_when_over_budget():
+    """Test that an impossible budget still returns a usable batch-size-1 setting."""
+    netG = Generator(ngpu=0).eval()
+    settings = run_autotune(netG, torch.device("cpu"), latency_budget_ms=0, **small_grid())
+
+    assert settings["batch_size"] == 1
+
+
+def test_tune_or_load_reuses_saved_result(tmp_path, monkeypatch):
+    """Test that a saved result for this host skips benchmarking on restart."""
+    netG = Generator(ngpu=0).eval()
+    path = tmp_path / "autotune.json"
+    first = tune_or_load(netG, torch.device("cpu"), path=path, **small_grid())
+
+    def fail(*args, **kwargs):
+        raise AssertionError("should not benchmark again")
+
+    monkeypatch.setattr(autotune, "autotune", fail)
+    second = tune_or_load(netG, torch.device("cpu"), path=path)
+
+    assert second["source"] == "cache"
+    assert second["batch_size"] == first["batch_size"]
+
+
+def test_tune_or_load_ignores_result_from_other_host(tmp_path):
+    """Test that a result saved on a different machine is re-tuned."""
+    path = tmp_path / "autotune.json"
+    signature = dict(host_signature(torch.device("cpu")), cpu_count=999)
+    path.write_text(json.dumps({"signature": signature, "num_threads": 1, "batch_size": 64,
+                                "memory_format": "contiguous"}))
+
+    netG = Generator(ngpu=0).eval()
+    settings = tune_or_load(netG, torch.device("cpu"), path=path, **small_grid())
+    assert settings["source"] == "autotune"
+
+
+def test_cgroup_v2_quota_caps_available_cpus(tmp_path):
+    """Test that a container's CPU quota, not the host's core count, bounds the thread grid."""
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+    assert autotune.cgroup_cpu_quota(tmp_path) == 1.5
+    assert autotune.available_cpus(tmp_path) == 1
+
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert autotune.cgroup_cpu_quota(tmp_path) is None
+
+
+def test_cgroup_v1_quota(tmp_path):
+    """Test that cgroup v1 quota files are read too, with -1 meaning unlimited."""
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("400000\n")
+    assert autotune.cgroup_cpu_quota(tmp_path) == 4.0
+
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("-1\n")
+    assert autotune.cgroup_cpu_quota(tmp_path) is None
+
+
+def test_tuned_batch_size_drives_card_rendering(monkeypatch):
+    """Test that the autotuned batch size is what the batched render path uses."""
+    from fastapi.testclient import TestClient
+    import app as app_module
+
+    tuned = dict(autotune.default_settings(), batch_size=8, source="autotune")
+    monkeypatch.setenv("AUTOTUNE", "true")
+    monkeypatch.setattr(app_module, "tune_or_load", lambda netG, device: tuned)
+    monkeypatch.setattr(app_module.card_renderer, "batch_size", 32)
+    monkeypatch.setattr(app_module, "inference_settings", app_module.inference_settings)  # Restored afterwards
+
+    with TestClient(app_module.app) as client:
+        assert app_module.card_renderer.batch_size == 8
+        assert client.get("/api/inference/config").json()["batch_size"] == 8
@@ -0,0 +1,45 @@
+import json
+from PIL import Image
+from models import Generator
+from build_packs import build_pack_pool, CARD_WIDTH, CARD_HEIGHT
+
+
+def test_atlas_layout_packs_cards_into_sheets(tmp_path):
+    """Test that the atlas layout fills sheets and crops the last one."""
+    netG = Generator(ngpu=0).eval()
+    manifest = build_pack_pool(netG, tmp_path, count=10, columns=2, rows=2, batch_size=4)
+
+    assert len(manifest["cards"]) == 10
+    assert manifest["atlases"] == ["atlas_000.webp", "atlas_001.webp", "atlas_002.webp"]
+
+    # 4 cards per full sheet, the last sheet only holds one row
+    full = Image.open(tmp_path / "atlas_000.webp")
+    last = Image.open(tmp_path / "atlas_002.webp")
+    assert full.size == (2 * CARD_WIDTH, 2 * CARD_HEIGHT)
+    assert last.size == (2 * CARD_WIDTH, CARD_HEIGHT)
+
+    last_card = manifest["cards"][-1]
+    assert (last_card["atlas"], last_card["x"], last_card["y"]) == (2, CARD_WIDTH, 0)
+
+
+def test_files_layout_and_manifest_on_disk(tmp_path):
+    """Test that the files layout writes one WebP per card and a matching manifest."""
+    netG = Generator(ngpu=0).eval()
+    build_pack_pool(netG, tmp_path, count=3, layout="files", start_seed=100)
+
+    with open(tmp_path / "manifest.json") as f:
+        manifest = json.load(f)
+
+    assert [card["seed"] for card in manifest["cards"]] == [100, 101, 102]
+    for card in manifest["cards"]:
+        assert card["rarity"] in manifest["rarity_weights"]
+        assert Image.open(tmp_path / card["file"]).size == (CARD_WIDTH, CARD_HEIGHT)
+
+
+def test_rarity_is_stable_across_builds(tmp_path):
+    """Test that rebuilding the same seeds assigns the same rarity tiers."""
+    netG = Generator(ngpu=0).eval()
+    first = build_pack_pool(netG, tmp_path / "a", count=20, layout="files")
+    second = build_pack_pool(netG, tmp_path / "b", count=20, layout="files")
+
+    assert [c["rarity"] for c in first["cards"]] == [c["rarity"] for c in second["cards"]]
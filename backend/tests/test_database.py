@@ -189,3 +189,34 @@ def test_pagination(client):
         assert page1_ids.isdisjoint(page2_ids)
     finally:
         db.close()
+
+
+def test_init_db_relaxes_legacy_not_null_image_data():
+    """Test that tables from before seed-only cards get a nullable image_data, keeping their rows."""
+    from sqlalchemy import inspect, text
+    from database import Base, engine, init_db
+
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE generated_cards (id INTEGER PRIMARY KEY, image_data TEXT NOT NULL, "
+            "upvotes INTEGER, created_at TIMESTAMP)"
+        ))
+        conn.execute(text("INSERT INTO generated_cards (image_data, upvotes) VALUES ('legacy', 3)"))
+
+    try:
+        init_db()
+        columns = {column["name"]: column for column in inspect(engine).get_columns("generated_cards")}
+        assert columns["image_data"]["nullable"]
+        assert {"seed", "model", "latent", "hot_score"} <= set(columns)
+
+        db = SessionLocal()
+        try:
+            card = db.query(GeneratedCard).one()
+            assert (card.image_data, card.upvotes) == ("legacy", 3)
+            db.add(GeneratedCard(seed=1, model="gan_checkpoint"))
+            db.commit()
+        finally:
+            db.close()
+    finally:
+        Base.metadata.drop_all(bind=engine)
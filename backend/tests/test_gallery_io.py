@@ -0,0 +1,177 @@
+import base64
+import io
+import json
+from datetime import datetime
+from PIL import Image
+from database import GeneratedCard, SessionLocal
+from gallery_io import export_ndjson, export_tar, import_records, read_ndjson, read_tar
+from ingest import canonical_png
+
+
+def png_base64(color):
+    # Imports re-encode images canonically, so round trips compare canonical PNGs
+    return canonical_png(Image.new("RGB", (64, 96), color))
+
+
+def add_cards(db):
+    db.add_all([
+        GeneratedCard(image_data=png_base64((255, 0, 0)), upvotes=3, created_at=datetime(2025, 1, 1, 12)),
+        GeneratedCard(image_data=png_base64((0, 255, 0)), upvotes=-1, created_at=datetime(2025, 1, 2, 12)),
+    ])
+    db.commit()
+    return [(c.id, c.image_data, c.upvotes, c.created_at) for c in db.query(GeneratedCard).order_by(GeneratedCard.id)]
+
+
+def clear_cards(db):
+    db.query(GeneratedCard).delete()
+    db.commit()
+
+
+def snapshot(db):
+    return [(c.id, c.image_data, c.upvotes, c.created_at) for c in db.query(GeneratedCard).order_by(GeneratedCard.id)]
+
+
+def test_ndjson_round_trip(client):
+    """Test that an NDJSON export imports back to identical rows."""
+    db = SessionLocal()
+    try:
+        before = add_cards(db)
+        out = io.BytesIO()
+        assert export_ndjson(db, out, batch_size=1) == 2
+
+        clear_cards(db)
+        out.seek(0)
+        assert import_records(db, read_ndjson(out), batch_size=1) == 2
+        assert snapshot(db) == before
+    finally:
+        db.close()
+
+
+def test_tar_round_trip(client):
+    """Test that the tar export holds a manifest plus PNGs and imports back."""
+    db = SessionLocal()
+    try:
+        before = add_cards(db)
+        out = io.BytesIO()
+        assert export_tar(db, out) == 2
+
+        out.seek(0)
+        clear_cards(db)
+        assert import_records(db, read_tar(out)) == 2
+        assert snapshot(db) == before
+    finally:
+        db.close()
+
+
+def test_import_with_new_ids_appends(client):
+    """Test that importing with new ids keeps existing cards."""
+    db = SessionLocal()
+    try:
+        add_cards(db)
+        out = io.BytesIO()
+        export_ndjson(db, out)
+        out.seek(0)
+
+        import_records(db, read_ndjson(out), keep_ids=False)
+        assert db.query(GeneratedCard).count() == 4
+    finally:
+        db.close()
+
+
+def test_admin_endpoints_require_token(client, monkeypatch):
+    """Test that admin endpoints are disabled without ADMIN_TOKEN and reject bad tokens."""
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    assert client.get("/api/admin/export").status_code == 403
+
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    assert client.get("/api/admin/export").status_code == 401
+    assert client.get("/api/admin/export", headers={"X-Admin-Token": "wrong"}).status_code == 401
+
+
+def test_admin_export_and_import(client, monkeypatch):
+    """Test exporting through the API and importing the stream back."""
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    headers = {"X-Admin-Token": "secret"}
+    client.post("/api/gallery/share", json={"image_data": png_base64((1, 2, 3))})
+    client.post("/api/gallery/share", json={"image_data": png_base64((4, 5, 6))})
+
+    export = client.get("/api/admin/export", headers=headers)
+    assert export.status_code == 200
+    lines = export.content.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 2]
+
+    # Same ids again conflict, new ids append
+    assert client.post("/api/admin/import", content=export.content, headers=headers).status_code == 409
+    response = client.post("/api/admin/import?new_ids=true", content=export.content, headers=headers)
+    assert response.json()["imported"] == 2
+    assert client.get("/api/gallery").json()["total"] == 4
+
+
+def test_admin_import_rejects_bad_json(client, monkeypatch):
+    """Test that malformed NDJSON returns 400."""
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    response = client.post("/api/admin/import", content=b"{not json}\n", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 400
+
+
+def test_admin_import_rejects_malformed_records(client, monkeypatch):
+    """Test that records of the wrong shape or type return 400 and insert nothing."""
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    headers = {"X-Admin-Token": "secret"}
+    for line in [b'"video"\n', b"[1, 2]\n", b'{"upvotes": 1}\n', b'{"id": "abc", "seed": 1}\n',
+                 b'{"seed": "1"}\n', b'{"seed": 1, "hot_score": null}\n', b'{"seed": 1, "model": 5}\n']:
+        response = client.post("/api/admin/import", content=line, headers=headers)
+        assert response.status_code == 400, line
+    assert client.get("/api/gallery").json()["total"] == 0
+
+
+def test_import_accepts_records_with_different_fields(client):
+    """Test that one batch can mix seed-only and image cards with different optional fields."""
+    db = SessionLocal()
+    try:
+        records = [{"seed": 1, "model": "gan_checkpoint"}, {"image_data": png_base64((9, 9, 9)), "upvotes": 2}]
+        assert import_records(db, records, keep_ids=False) == 2
+        assert [(c.seed, c.upvotes) for c in db.query(GeneratedCard).order_by(GeneratedCard.id)] == [(1, 0), (None, 2)]
+    finally:
+        db.close()
+
+
+def test_admin_import_rejects_invalid_images(client, monkeypatch):
+    """Test that imported images get the same validation as shares."""
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    headers = {"X-Admin-Token": "secret"}
+    buffered = io.BytesIO()
+    Image.new("RGB", (32, 32)).save(buffered, format="PNG")
+    wrong_size = base64.b64encode(buffered.getvalue()).decode()
+
+    for image_data in ["not an image", wrong_size]:
+        line = json.dumps({"image_data": image_data}).encode()
+        assert client.post("/api/admin/import", content=line, headers=headers).status_code == 400
+    assert client.get("/api/gallery").json()["total"] == 0
+
+
+def test_import_canonicalizes_images(client):
+    """Test that imported images are stored as the canonical PNG."""
+    buffered = io.BytesIO()
+    Image.new("RGB", (64, 96), (7, 8, 9)).save(buffered, format="PNG", compress_level=0)
+    db = SessionLocal()
+    try:
+        import_records(db, [{"image_data": base64.b64encode(buffered.getvalue()).decode()}])
+        assert db.query(GeneratedCard).one().image_data == png_base64((7, 8, 9))
+    finally:
+        db.close()
+
+
+def test_admin_similarity_rebuild_picks_up_cli_imports(client, monkeypatch):
+    """Test that the rebuild endpoint indexes cards written behind the app's back."""
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    db = SessionLocal()
+    try:
+        import_records(db, [{"id": 5, "seed": 5, "model": "gan_checkpoint", "latent": base64.b64encode(bytes(400)).decode()}])
+    finally:
+        db.close()
+    assert client.get("/api/gallery/5/similar").status_code == 404
+
+    response = client.post("/api/admin/similarity/rebuild", headers={"X-Admin-Token": "secret"})
+    assert response.json()["indexed"] == 1
+    assert client.get("/api/gallery/5/similar").status_code == 200
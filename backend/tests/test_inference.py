@@ -0,0 +1,40 @@
+import torch
+from PIL import Image
+from io import BytesIO
+from inference import seed_latent, interpolate_latents, tensors_to_images, encode_animation
+
+
+def test_seed_latent_is_deterministic():
+    """Test that the same seed always produces the same latent vector."""
+    assert torch.equal(seed_latent(7), seed_latent(7))
+    assert not torch.equal(seed_latent(7), seed_latent(8))
+
+
+def test_interpolate_latents_endpoints_match_inputs():
+    """Test that the latent path starts and ends at the two seed latents."""
+    a = seed_latent(1)
+    b = seed_latent(2)
+
+    for mode in ["linear", "slerp"]:
+        path = interpolate_latents(a, b, 6, mode)
+        assert path.shape == (6, 100, 1, 1)
+        assert torch.allclose(path[0], a[0], atol=1e-5)
+        assert torch.allclose(path[-1], b[0], atol=1e-5)
+
+
+def test_tensors_to_images_converts_whole_batch():
+    """Test that a generator-shaped batch becomes one 64x96 RGB image per sample."""
+    images = tensors_to_images(torch.zeros(3, 3, 96, 64))
+    assert len(images) == 3
+    assert images[0].size == (64, 96)
+    assert images[0].mode == "RGB"
+
+
+def test_encode_animation_keeps_every_frame():
+    """Test that animated WebP and GIF encodings contain one frame per input."""
+    frames = [Image.new("RGB", (64, 96), (i * 40, 0, 0)) for i in range(5)]
+
+    for fmt in ["webp", "gif"]:
+        img = Image.open(BytesIO(encode_animation(frames, fmt)))
+        assert img.format == fmt.upper()
+        assert img.n_frames == 5
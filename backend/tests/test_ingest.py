@@ -0,0 +1,53 @@
+import base64
+from io import BytesIO
+
+import pytest
+from PIL import Image, PngImagePlugin
+from ingest import InvalidImage, canonicalize_card_image, decode_card_image
+
+
+def encode(img, **save_args):
+    buffered = BytesIO()
+    img.save(buffered, **save_args)
+    return base64.b64encode(buffered.getvalue()).decode()
+
+
+def test_canonical_png_is_smaller_and_drops_metadata():
+    """Test that uncompressed, metadata-heavy uploads are stored as a compact plain PNG."""
+    info = PngImagePlugin.PngInfo()
+    info.add_text("comment", "x" * 5000)
+    bloated = encode(Image.new("RGB", (64, 96), (10, 20, 30)), format="PNG", compress_level=0, pnginfo=info)
+
+    canonical = canonicalize_card_image(bloated)
+    assert len(canonical) < len(bloated)
+
+    img = Image.open(BytesIO(base64.b64decode(canonical)))
+    assert img.format == "PNG"
+    assert "comment" not in img.info
+    assert img.getpixel((0, 0)) == (10, 20, 30)
+
+
+def test_canonical_form_is_format_independent():
+    """Test that the same pixels sent as PNG or lossless WebP are stored identically."""
+    img = Image.new("RGB", (64, 96), (200, 30, 30))
+    assert canonicalize_card_image(encode(img, format="PNG")) == \
+        canonicalize_card_image(encode(img, format="WEBP", lossless=True))
+
+
+def test_data_uri_prefix_is_accepted():
+    """Test that a data: URI (as shown in <img src>) can be shared directly."""
+    image_data = encode(Image.new("RGB", (64, 96)), format="PNG")
+    assert decode_card_image(f"data:image/png;base64,{image_data}").size == (64, 96)
+
+
+@pytest.mark.parametrize("image_data", [
+    "not base64!",
+    base64.b64encode(b"definitely not an image").decode(),
+    encode(Image.new("RGB", (96, 64)), format="PNG"),
+    encode(Image.new("RGBA", (64, 96)), format="PNG"),
+    encode(Image.new("RGB", (4096, 4096)), format="PNG"),
+])
+def test_invalid_images_are_rejected(image_data):
+    """Test that anything but a decodable 64x96 RGB image is refused."""
+    with pytest.raises(InvalidImage):
+        decode_card_image(image_data)
@@ -0,0 +1,40 @@
+import pytest
+from loadtest import parse_mix, percentile, summarize, DEFAULT_MIX
+
+
+def test_parse_mix_reads_weights():
+    """Test that the traffic mix string is parsed into operation weights."""
+    assert parse_mix("generate=1,gallery=6,vote=2.5") == {"generate": 1.0, "gallery": 6.0, "vote": 2.5}
+
+
+def test_parse_mix_rejects_unknown_operation():
+    """Test that typos in the traffic mix fail loudly."""
+    with pytest.raises(ValueError):
+        parse_mix("generate=1,delete=3")
+
+
+def test_percentile_nearest_rank():
+    """Test nearest-rank percentiles on a known distribution."""
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 50) == 0.0
+
+
+def test_summarize_reports_error_rate_and_throughput():
+    """Test that samples are aggregated per operation and in total."""
+    samples = [("generate", 0.1, True), ("generate", 0.3, False), ("gallery", 0.2, True)]
+    report = summarize(samples, elapsed=2.0)
+
+    assert report["generate"]["requests"] == 2
+    assert report["generate"]["error_rate"] == 0.5
+    assert report["total"]["requests"] == 3
+    assert report["total"]["throughput"] == 1.5
+    assert report["gallery"]["max_ms"] == pytest.approx(200)
+
+
+def test_default_mix_shares_by_seed():
+    """Test that the default traffic shares cards the way the frontend does."""
+    weights = parse_mix(DEFAULT_MIX)
+    assert weights["share_seed"] > 0
+    assert "share" not in weights
@@ -0,0 +1,90 @@
+import torch
+from models import Generator, Discriminator
+from quality import best_of_n, QualityMetrics
+
+
+def test_best_of_n_returns_highest_scores_first():
+    """Test that best-of-N keeps the top-scoring candidates in order."""
+    netG = Generator(ngpu=0).eval()
+    netD = Discriminator(ngpu=0).eval()
+    seeds = list(range(8))
+
+    best, generator_ms, discriminator_ms = best_of_n(netG, netD, seeds, count=3)
+
+    # Score every candidate individually to check the batched ranking
+    with torch.no_grad():
+        from inference import seed_latent
+        individual = {seed: netD(netG(seed_latent(seed))).item() for seed in seeds}
+
+    # Untrained weights give near-identical scores, so allow for batched vs single-pass rounding
+    scores = [score for _, _, score in best]
+    assert scores == sorted(scores, reverse=True)
+    for seed, _, score in best:
+        assert abs(score - individual[seed]) < 1e-4
+    kept = {seed for seed, _, _ in best}
+    assert all(individual[seed] <= min(scores) + 1e-4 for seed in seeds if seed not in kept)
+    assert best[0][1].shape == (1, 3, 96, 64)
+    assert generator_ms > 0 and discriminator_ms > 0
+
+
+def test_quality_metrics_averages():
+    """Test that metrics report per-request and per-candidate costs."""
+    metrics = QualityMetrics()
+    metrics.record(8, [0.9], generator_ms=8.0, discriminator_ms=4.0)
+    metrics.record(4, [0.5], generator_ms=4.0, discriminator_ms=2.0)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["requests"] == 2
+    assert snapshot["candidates_scored"] == 12
+    assert snapshot["avg_generator_ms"] == 6.0
+    assert snapshot["avg_ms_per_candidate"] == 1.5
+    assert snapshot["avg_returned_score"] == 0.7
+
+
+def test_generate_quality_best(client):
+    """Test that quality mode returns one scored, seeded card."""
+    response = client.get("/api/card/generate?quality=best&k=4")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data["image"].startswith("data:image/png;base64,")
+    assert 0 <= data["score"] <= 1
+    assert isinstance(data["seed"], int)
+
+
+def test_best_endpoint_returns_top_cards_and_tracks_cost(client):
+    """Test that the best endpoint returns `count` cards and updates the metrics."""
+    before = client.get("/api/inference/quality").json()["candidates_scored"]
+
+    data = client.get("/api/card/best?k=6&count=2").json()
+    assert len(data["cards"]) == 2
+    assert data["cards"][0]["score"] >= data["cards"][1]["score"]
+
+    metrics = client.get("/api/inference/quality").json()
+    assert metrics["enabled"] is True
+    assert metrics["candidates_scored"] == before + 6
+
+
+def test_quality_mode_validates_params(client):
+    """Test that bad k/count/quality values return 400."""
+    assert client.get("/api/card/generate?quality=ultra").status_code == 400
+    assert client.get("/api/card/generate?quality=best&seed=1").status_code == 400
+    assert client.get("/api/card/best?k=1000").status_code == 400
+    assert client.get("/api/card/best?k=0").status_code == 400
+    assert client.get("/api/card/generate?quality=best&k=0").status_code == 400
+    assert client.get("/api/card/best?k=2&count=3").status_code == 400
+
+
+def test_best_of_n_is_charged_per_candidate():
+    """Test that quality requests take generate tokens in proportion to k."""
+    from app import generation_cost, IMAGES_PER_TOKEN
+
+    def cost(path, query=b""):
+        return generation_cost({"path": path, "query_string": query})
+
+    assert cost("/api/card/generate") == 1
+    assert cost("/api/card/generate", b"seed=1&k=64") == 1
+    assert cost("/api/card/best", b"k=64") == 64 // IMAGES_PER_TOKEN
+    assert cost("/api/card/generate", b"quality=best&k=64") == 64 // IMAGES_PER_TOKEN
+    assert cost("/api/card/best", b"k=1") == 1
+    assert cost("/api/card/best", b"k=abc") == 1
@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+import pytest
+from database import Base, GeneratedCard, HotDecayState, SessionLocal, engine
+from ranking import decay_factor, decay_hot_scores, run_hot_decay, utc_now, HOT_HALF_LIFE_HOURS, MIN_SCORE
+
+
+def test_decay_factor_halves_every_half_life():
+    """Test that one half-life halves the score and zero time keeps it."""
+    assert decay_factor(0) == 1.0
+    assert decay_factor(HOT_HALF_LIFE_HOURS * 3600) == pytest.approx(0.5)
+
+
+def test_decay_hot_scores_updates_every_batch(client):
+    """Test that batched decay reaches every row, however the ids are split."""
+    db = SessionLocal()
+    try:
+        db.add_all([GeneratedCard(image_data=f"image{i}", hot_score=8.0) for i in range(7)])
+        db.commit()
+
+        updated = decay_hot_scores(db, HOT_HALF_LIFE_HOURS * 3600, batch_size=3)
+        assert updated == 7
+
+        scores = [card.hot_score for card in db.query(GeneratedCard).all()]
+        assert scores == pytest.approx([4.0] * 7)
+    finally:
+        db.close()
+
+
+def test_decay_hot_scores_snaps_cold_cards_to_zero(client):
+    """Test that tiny scores become exactly zero and zero rows are skipped."""
+    db = SessionLocal()
+    try:
+        db.add_all([
+            GeneratedCard(image_data="cold", hot_score=MIN_SCORE * 1.5),
+            GeneratedCard(image_data="zero", hot_score=0.0),
+            GeneratedCard(image_data="negative", hot_score=-4.0),
+        ])
+        db.commit()
+
+        updated = decay_hot_scores(db, HOT_HALF_LIFE_HOURS * 3600)
+        assert updated == 2
+
+        scores = {card.image_data: card.hot_score for card in db.query(GeneratedCard).all()}
+        assert scores == {"cold": 0.0, "zero": 0.0, "negative": pytest.approx(-2.0)}
+    finally:
+        db.close()
+
+
+def test_vote_updates_hot_score(client, card_image):
+    """Test that voting changes the stored hot score incrementally."""
+    card_id = client.post("/api/gallery/share", json={"image_data": card_image}).json()["id"]
+    client.post(f"/api/gallery/{card_id}/upvote")
+    client.post(f"/api/gallery/{card_id}/upvote")
+
+    db = SessionLocal()
+    try:
+        card = db.query(GeneratedCard).filter(GeneratedCard.id == card_id).first()
+        assert card.hot_score == pytest.approx(3.0)
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def tables():
+    """Tables without starting the app, whose own decay loop would race these tests"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_run_hot_decay_applies_wall_clock_time_since_last_run(tables):
+    """Test that decay covers the real time between runs, e.g. across a restart."""
+    db = SessionLocal()
+    try:
+        start = utc_now()
+        db.add(HotDecayState(id=1, decayed_at=start))  # Last run, e.g. just before shutting down
+        db.add(GeneratedCard(image_data="card", hot_score=8.0))
+        db.commit()
+
+        # The server was down for a whole half-life in between
+        later = start + timedelta(hours=HOT_HALF_LIFE_HOURS)
+        assert run_hot_decay(later) == 1
+        assert run_hot_decay(later) == 0  # Already claimed, nothing is decayed twice
+
+        db.expire_all()
+        assert db.query(GeneratedCard).one().hot_score == pytest.approx(4.0)
+        assert db.get(HotDecayState, 1).decayed_at == later
+    finally:
+        db.close()
+
+
+def test_first_decay_run_only_starts_the_clock(tables):
+    """Test that with no recorded run there's no interval to decay."""
+    db = SessionLocal()
+    try:
+        db.add(GeneratedCard(image_data="card", hot_score=8.0))
+        db.commit()
+    finally:
+        db.close()
+
+    now = utc_now() + timedelta(days=1)
+    assert run_hot_decay(now) == 0
+    db = SessionLocal()
+    try:
+        assert db.query(GeneratedCard).one().hot_score == 8.0
+    finally:
+        db.close()
@@ -0,0 +1,173 @@
+import asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from ratelimit import RateLimit, InMemoryBucketStore, RateLimitMiddleware, client_key, limits_from_env, query_params
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_app(store, burst=2, rate=1.0, api_keys=frozenset(), trusted_proxy_hops=0, generate_cost=None):
+    """Small app with the rate limiter configured like app.py"""
+    app = FastAPI()
+    app.add_middleware(
+        RateLimitMiddleware,
+        limits=[
+            RateLimit("generate", rate, burst, methods=["GET"], path_prefix="/api/card/", cost=generate_cost),
+            RateLimit("gallery_write", rate, burst, methods=["POST"], path_prefix="/api/gallery"),
+        ],
+        store=store,
+        api_keys=api_keys,
+        trusted_proxy_hops=trusted_proxy_hops,
+    )
+
+    @app.get("/api/card/generate")
+    def generate():
+        return {"ok": True}
+
+    @app.post("/api/gallery/share")
+    def share():
+        return {"ok": True}
+
+    @app.get("/api/gallery")
+    def gallery():
+        return {"ok": True}
+
+    return app
+
+
+def test_bucket_allows_burst_then_waits():
+    """Test that a bucket allows `burst` requests then reports the refill wait."""
+    clock = FakeClock()
+    store = InMemoryBucketStore(clock=clock)
+
+    assert asyncio.run(store.take("a", rate=0.5, burst=2)) == 0
+    assert asyncio.run(store.take("a", rate=0.5, burst=2)) == 0
+    assert asyncio.run(store.take("a", rate=0.5, burst=2)) == 2.0
+
+
+def test_bucket_refills_over_time():
+    """Test that tokens refill at the configured rate."""
+    clock = FakeClock()
+    store = InMemoryBucketStore(clock=clock)
+
+    asyncio.run(store.take("a", rate=1.0, burst=1))
+    assert asyncio.run(store.take("a", rate=1.0, burst=1)) > 0
+
+    clock.now += 1.0
+    assert asyncio.run(store.take("a", rate=1.0, burst=1)) == 0
+
+
+def test_bucket_takes_weighted_cost():
+    """Test that a request can take several tokens and waits until that many have refilled."""
+    clock = FakeClock()
+    store = InMemoryBucketStore(clock=clock)
+
+    assert asyncio.run(store.take("a", rate=1.0, burst=4, cost=3)) == 0
+    assert asyncio.run(store.take("a", rate=1.0, burst=4, cost=3)) == 2.0
+    clock.now += 2.0
+    assert asyncio.run(store.take("a", rate=1.0, burst=4, cost=3)) == 0
+
+
+def test_prune_drops_only_refilled_buckets():
+    """Test that pruning forgets idle clients but keeps throttled ones."""
+    clock = FakeClock()
+    store = InMemoryBucketStore(max_keys=2, clock=clock)
+
+    asyncio.run(store.take("idle", rate=1.0, burst=1))
+    clock.now += 0.5
+    asyncio.run(store.take("busy", rate=0.01, burst=1))
+    clock.now += 1.0
+    asyncio.run(store.take("new", rate=1.0, burst=1))
+
+    assert "idle" not in store.buckets
+    assert "busy" in store.buckets
+
+
+def test_over_limit_returns_429_with_retry_after():
+    """Test that the middleware answers over-limit clients with 429 and Retry-After."""
+    client = TestClient(make_app(InMemoryBucketStore(clock=FakeClock())))
+
+    assert client.get("/api/card/generate").status_code == 200
+    assert client.get("/api/card/generate").status_code == 200
+
+    response = client.get("/api/card/generate")
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+
+
+def test_limits_are_per_client_and_per_route_group():
+    """Test that API keys and route groups get independent buckets."""
+    client = TestClient(make_app(InMemoryBucketStore(clock=FakeClock()), burst=1, api_keys={"other"}))
+
+    assert client.get("/api/card/generate").status_code == 200
+    assert client.get("/api/card/generate").status_code == 429
+
+    # Another client (API key) and another limit group are unaffected
+    assert client.get("/api/card/generate", headers={"X-API-Key": "other"}).status_code == 200
+    assert client.post("/api/gallery/share").status_code == 200
+
+
+def test_request_cost_is_capped_at_burst():
+    """Test that expensive requests drain the bucket but are never impossible."""
+    def cost(scope):
+        return int(query_params(scope).get("n", "1"))
+
+    client = TestClient(make_app(InMemoryBucketStore(clock=FakeClock()), burst=4, generate_cost=cost))
+
+    assert client.get("/api/card/generate?n=100").status_code == 200
+    assert client.get("/api/card/generate").status_code == 429
+
+
+def test_unmatched_requests_are_not_limited():
+    """Test that requests outside the configured limits pass straight through."""
+    client = TestClient(make_app(InMemoryBucketStore(clock=FakeClock()), burst=1))
+
+    for _ in range(5):
+        assert client.get("/api/gallery").status_code == 200
+
+
+def test_unknown_api_keys_do_not_get_their_own_bucket():
+    """Test that rotating made-up API keys can't bypass the per-IP limit."""
+    client = TestClient(make_app(InMemoryBucketStore(clock=FakeClock()), burst=1, api_keys={"partner"}))
+
+    assert client.get("/api/card/generate", headers={"X-API-Key": "made-up-1"}).status_code == 200
+    assert client.get("/api/card/generate", headers={"X-API-Key": "made-up-2"}).status_code == 429
+
+
+def test_spoofed_forwarded_for_is_ignored():
+    """Test that only the X-Forwarded-For hop appended by our proxy identifies the client."""
+    client = TestClient(make_app(InMemoryBucketStore(clock=FakeClock()), burst=1, trusted_proxy_hops=1))
+
+    # The client controls everything left of the last hop, our proxy appended 203.0.113.7
+    assert client.get("/api/card/generate", headers={"X-Forwarded-For": "1.1.1.1, 203.0.113.7"}).status_code == 200
+    assert client.get("/api/card/generate", headers={"X-Forwarded-For": "2.2.2.2, 203.0.113.7"}).status_code == 429
+    assert client.get("/api/card/generate", headers={"X-Forwarded-For": "203.0.113.8"}).status_code == 200
+
+
+def test_client_key_without_trusted_proxies_uses_socket_peer():
+    """Test that X-Forwarded-For is ignored entirely unless proxies are configured."""
+    scope = {"client": ("10.0.0.5", 1234), "headers": [(b"x-forwarded-for", b"1.2.3.4")]}
+    assert client_key(scope) == "ip:10.0.0.5"
+    assert client_key(scope, trusted_proxy_hops=1) == "ip:1.2.3.4"
+
+
+def test_default_limits_cover_gallery_reads():
+    """Test that gallery reads (which can render cards) and card images have their own buckets."""
+    limits = limits_from_env()
+
+    def limit_for(method, path):
+        return next((l.name for l in limits if l.matches(method, path)), None)
+
+    assert limit_for("GET", "/api/card/generate") == "generate"
+    assert limit_for("POST", "/api/gallery/share") == "gallery_write"
+    assert limit_for("GET", "/api/gallery") == "gallery_read"
+    assert limit_for("GET", "/api/gallery/1/similar") == "gallery_read"
+    # <img> tags and CDN pulls get their own, larger bucket
+    assert limit_for("GET", "/api/gallery/1/image") == "card_image"
+    assert limit_for("GET", "/health/ready") is None
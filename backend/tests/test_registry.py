@@ -0,0 +1,104 @@
+import pytest
+import torch
+from registry import ModelRegistry, ModelNotFound
+
+
+class FakeNet(torch.nn.Module):
+    """One float32 parameter of `size` elements (4 bytes each)"""
+
+    def __init__(self, size):
+        super().__init__()
+        self.weight = torch.nn.Parameter(torch.zeros(size))
+
+
+def make_registry(tmp_path, names, budget_bytes=10_000, **kwargs):
+    for name in names:
+        (tmp_path / f"{name}.pth").touch()
+    loads = []
+
+    def loader(path, device):
+        loads.append(path.stem)
+        return FakeNet(1000), None  # 4000 bytes per model
+
+    registry = ModelRegistry("cpu", tmp_path, names[0], budget_bytes, loader=loader, **kwargs)
+    return registry, loads
+
+
+def test_get_loads_once_and_caches(tmp_path):
+    """Test that a checkpoint is loaded on first use only."""
+    registry, loads = make_registry(tmp_path, ["main"])
+
+    assert registry.get() is registry.get("main")
+    assert loads == ["main"]
+
+
+def test_lru_eviction_keeps_default(tmp_path):
+    """Test that the least recently used non-default model is evicted over budget."""
+    registry, loads = make_registry(tmp_path, ["main", "a", "b"])
+    registry.get()
+    registry.get("a")
+    registry.get("b")  # 12000 bytes > 10000: "a" goes, the default stays
+
+    assert list(registry.models) == ["main", "b"]
+    assert registry.total_bytes() <= registry.memory_budget_bytes
+
+    registry.get("a")  # Reloaded on demand
+    assert loads == ["main", "a", "b", "a"]
+
+
+def test_unknown_and_unsafe_names_are_rejected(tmp_path):
+    """Test that only checkpoint files inside the directory can be loaded."""
+    registry, _ = make_registry(tmp_path, ["main"])
+
+    with pytest.raises(ModelNotFound):
+        registry.get("missing")
+    with pytest.raises(ModelNotFound):
+        registry.get("../main")
+
+
+def test_set_default_prepares_before_swapping(tmp_path):
+    """Test that the new default is loaded and prepared before it takes over."""
+    registry, _ = make_registry(tmp_path, ["main", "next"])
+    registry.get()
+    old = registry.get()
+    prepared = []
+
+    def prepare(model):
+        assert registry.default_name == "main"  # Still serving the old model meanwhile
+        prepared.append(model.name)
+
+    assert registry.set_default("next", prepare=prepare) == "main"
+    assert prepared == ["next"]
+    assert registry.get().name == "next"
+    assert old.netG is not None  # In-flight holders keep their model
+
+    status = registry.status()
+    assert status["default"] == "next"
+    assert status["available"] == ["main", "next"]
+
+
+def test_unknown_names_leave_no_state_behind(tmp_path):
+    """Test that bogus ?model= values don't accumulate load locks."""
+    registry, _ = make_registry(tmp_path, ["main"])
+    for i in range(100):
+        with pytest.raises(ModelNotFound):
+            registry.get(f"bogus{i}")
+    assert registry.load_locks == {}
+
+
+def test_versions_follow_file_content(tmp_path):
+    """Test that a checkpoint replaced in place gets a new version, and old versions are found by hash."""
+    registry, _ = make_registry(tmp_path, ["main"])
+    (tmp_path / "main.pth").write_bytes(b"weights v1")
+    v1 = registry.get().version
+
+    # Retrained in place, the old weights kept under another name
+    (tmp_path / "main_v1.pth").write_bytes(b"weights v1")
+    (tmp_path / "main.pth").write_bytes(b"weights v2, retrained")
+    registry.models.clear()
+
+    assert registry.get().version != v1
+    assert registry.get_version("main", v1).name == "main_v1"
+    (tmp_path / "main_v1.pth").unlink()
+    with pytest.raises(ModelNotFound):
+        registry.get_version("main", v1)
@@ -0,0 +1,91 @@
+import base64
+import threading
+import time
+from io import BytesIO
+
+import torch
+from PIL import Image
+from models import Generator
+from registry import LoadedModel, ModelNotFound
+from render import CardRenderer
+
+
+class FakeRegistry:
+    device = torch.device("cpu")
+
+    def __init__(self):
+        self.netG = Generator(ngpu=0).eval()
+        self.batches = []
+        original_forward = self.netG.forward
+
+        def counting_forward(latents):
+            self.batches.append(len(latents))
+            return original_forward(latents)
+
+        self.netG.forward = counting_forward
+
+    def get_version(self, name, version=None):
+        if name != "main" or version not in (None, "v1"):
+            raise ModelNotFound(name)
+        return LoadedModel(name, self.netG, None, "v1")
+
+
+def test_render_many_batches_misses_and_caches():
+    """Test that a page of seed-only cards is rendered in batches, then served from the cache."""
+    registry = FakeRegistry()
+    renderer = CardRenderer(registry, cache_size=10, batch_size=4)
+    keys = [("main", "v1", seed) for seed in range(6)]
+
+    images = renderer.render_many(keys)
+    assert registry.batches == [4, 2]
+    assert set(images) == set(keys)
+    img = Image.open(BytesIO(base64.b64decode(images[("main", "v1", 0)])))
+    assert (img.format, img.size, img.mode) == ("PNG", (64, 96), "RGB")
+
+    assert renderer.render_many(keys) == images
+    assert registry.batches == [4, 2]
+    assert renderer.stats() == {"cached": 6, "hits": 6, "misses": 6}
+
+
+def test_render_cache_evicts_least_recently_used():
+    """Test that the render cache stays within its size."""
+    renderer = CardRenderer(FakeRegistry(), cache_size=2)
+    for seed in range(3):
+        renderer.render("main", "v1", seed)
+    assert list(renderer.cache) == [("main", "v1", 1), ("main", "v1", 2)]
+
+
+def test_unavailable_model_is_skipped():
+    """Test that cards whose checkpoint is gone or was replaced are left out instead of failing the page."""
+    renderer = CardRenderer(FakeRegistry())
+    images = renderer.render_many([("main", "v1", 1), ("deleted", "v1", 2), ("main", "retrained", 3)])
+    assert set(images) == {("main", "v1", 1)}
+    assert renderer.render("deleted", "v1", 2) is None
+
+
+def test_render_concurrency_is_bounded():
+    """Test that concurrent cold pages never run more netG batches at once than allowed."""
+    registry = FakeRegistry()
+    active, peak = [0], [0]
+    lock = threading.Lock()
+    forward = registry.netG.forward
+
+    def slow_forward(latents):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return forward(latents)
+
+    registry.netG.forward = slow_forward
+    renderer = CardRenderer(registry, concurrency=1)
+    threads = [threading.Thread(target=renderer.render, args=("main", "v1", seed)) for seed in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak[0] == 1
+    assert len(renderer.cache) == 4
@@ -0,0 +1,86 @@
+import numpy as np
+from database import GeneratedCard, SessionLocal
+from similarity import LatentIndex, build_index, latent_to_bytes, latent_from_bytes
+
+
+def test_query_returns_nearest_by_cosine():
+    """Test that results are ordered by cosine similarity, scale-invariant."""
+    index = LatentIndex(dim=3, capacity=2)
+    index.add(1, [1, 0, 0])
+    index.add(2, [0, 1, 0])
+    index.add(3, [10, 1, 0])  # Same direction as card 1, mostly
+
+    results = index.query([1, 0, 0], k=2)
+    assert [card_id for card_id, _ in results] == [1, 3]
+    assert results[0][1] == 1.0
+
+
+def test_query_excludes_the_card_itself():
+    """Test that the query card is never returned as its own neighbour."""
+    index = LatentIndex(dim=2)
+    index.add(1, [1, 0])
+    index.add(2, [0, 1])
+
+    assert index.query([1, 0], k=5, exclude_id=1) == [(2, 0.0)]
+
+
+def test_remove_keeps_rows_contiguous():
+    """Test that removing a card moves the last row into its slot."""
+    index = LatentIndex(dim=2)
+    for card_id in range(1, 5):
+        index.add(card_id, [card_id, 1])
+
+    index.remove(2)
+    assert len(index) == 3
+    assert index.get(2) is None
+    assert np.allclose(index.get(4), np.array([4, 1]) / np.linalg.norm([4, 1]))
+    assert {card_id for card_id, _ in index.query([1, 1], k=10)} == {1, 3, 4}
+
+
+def test_latent_bytes_round_trip():
+    """Test that latents survive the float32 bytes encoding used in the DB."""
+    latent = np.random.randn(100).astype(np.float32)
+    data = latent_to_bytes(latent)
+    assert len(data) == 400
+    assert np.array_equal(latent_from_bytes(data), latent)
+
+
+def test_build_index_loads_only_cards_with_latents(client):
+    """Test that the index is built from the stored latents."""
+    db = SessionLocal()
+    try:
+        db.add_all([
+            GeneratedCard(image_data="a", latent=latent_to_bytes(np.ones(100))),
+            GeneratedCard(image_data="b"),
+        ])
+        db.commit()
+
+        index = LatentIndex()
+        assert build_index(index, db, batch_size=1) == 1
+    finally:
+        db.close()
+
+
+def test_similar_endpoint(client, card_image):
+    """Test that cards shared with a seed can be searched for neighbours."""
+    ids = [
+        client.post("/api/gallery/share", json={"image_data": card_image, "seed": seed}).json()["id"]
+        for seed in range(5)
+    ]
+    no_latent = client.post("/api/gallery/share", json={"image_data": card_image}).json()["id"]
+
+    response = client.get(f"/api/gallery/{ids[0]}/similar?limit=3")
+    assert response.status_code == 200
+    cards = response.json()["cards"]
+    assert len(cards) == 3
+    assert ids[0] not in [card["id"] for card in cards]
+    assert cards[0]["similarity"] >= cards[1]["similarity"] >= cards[2]["similarity"]
+
+    assert client.get(f"/api/gallery/{no_latent}/similar").status_code == 404
+    assert client.get("/api/gallery/9999/similar").status_code == 404
+
+
+def test_share_with_invalid_seed_returns_400(client, card_image):
+    """Test that out-of-range seeds are rejected."""
+    response = client.post("/api/gallery/share", json={"image_data": card_image, "seed": -1})
+    assert response.status_code == 400
@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+from sqlalchemy import text
+from database import Base, GeneratedCard, SessionLocal, engine
+from writequeue import WriteQueue
+
+
+@pytest.fixture
+def writer():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    write_queue = WriteQueue()
+    write_queue.start()
+    yield write_queue
+    write_queue.stop()
+    Base.metadata.drop_all(bind=engine)
+
+
+def block_writer(writer):
+    """Occupy the writer thread until the returned event is set"""
+    started, release = threading.Event(), threading.Event()
+
+    def job(db):
+        started.set()
+        return release.wait(5)
+
+    future = writer.submit(job)
+    started.wait(5)
+    return future, release
+
+
+def insert(image_data):
+    def job(db):
+        card = GeneratedCard(image_data=image_data)
+        db.add(card)
+        db.flush()
+        return card.id
+    return job
+
+
+def test_sqlite_connections_use_wal():
+    """Test that the SQLite profile pragmas are applied on connect."""
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+
+
+def test_queued_writes_share_one_transaction(writer):
+    """Test that writes queued behind a running batch are committed together."""
+    blocker, release = block_writer(writer)
+    futures = [writer.submit(insert(f"image{i}")) for i in range(10)]
+    release.set()
+
+    ids = [future.result(timeout=5) for future in futures]
+    assert blocker.result(timeout=5) is True
+    assert len(set(ids)) == 10
+    assert writer.stats() == {"batches": 2, "jobs": 11, "avg_batch_size": 5.5, "fallbacks": 0}
+
+
+def test_failed_job_only_fails_itself(writer):
+    """Test that a failing job is isolated by retrying the batch one job at a time."""
+    _, release = block_writer(writer)
+
+    def broken(db):
+        insert("partial")(db)
+        raise ValueError("boom")
+
+    good = writer.submit(insert("good"))
+    bad = writer.submit(broken)
+    release.set()
+
+    assert good.result(timeout=5) > 0
+    with pytest.raises(ValueError):
+        bad.result(timeout=5)
+    assert writer.stats()["fallbacks"] == 1
+
+    with SessionLocal() as db:
+        assert [card.image_data for card in db.query(GeneratedCard)] == ["good"]
+
+
+def test_stop_drains_queue(writer):
+    """Test that stopping the writer finishes already queued jobs."""
+    futures = [writer.submit(insert(f"image{i}")) for i in range(5)]
+    writer.stop()
+    assert all(future.done() for future in futures)
+    writer.start()
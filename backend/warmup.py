@@ -0,0 +1,30 @@
+"""Warm-up passes run before the app reports ready"""
+
+import time
+
+import torch
+
+from models import nz
+
+
+def timed(fn, *args, **kwargs):
+    """Run fn and return (result, elapsed ms)"""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, round((time.perf_counter() - start) * 1000, 2)
+
+
+def warm_up_models(netG, netD, batch_sizes, device):
+    """One dummy forward pass per serving batch size, so torch picks kernels and allocates before real traffic"""
+    durations = {}
+    with torch.no_grad():
+        for batch_size in sorted(set(batch_sizes)):
+            noise = torch.randn(batch_size, nz, 1, 1, device=device)
+            start = time.perf_counter()
+            fake_images = netG(noise)
+            if netD is not None:
+                netD(fake_images)
+            if device.type == "cuda":
+                torch.cuda.synchronize()
+            durations[batch_size] = round((time.perf_counter() - start) * 1000, 2)
+    return durations
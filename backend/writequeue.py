@@ -0,0 +1,135 @@
+"""Single-writer queue that groups gallery writes into shared transactions.
+
+SQLite allows one writer at a time, so concurrent share/vote requests would
+otherwise queue up on the database lock and each pay for its own commit (an
+fsync). Here every write is a job `fn(db) -> result` handed to one writer
+thread, which drains whatever is queued and runs it in one transaction with one
+commit. A batch of one costs no extra latency; batches only grow when writes
+arrive faster than commits finish.
+
+If anything in a batch fails, the whole batch is rolled back and each job is
+retried in its own transaction, so one bad job only fails its own request.
+"""
+
+import asyncio
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+from database import SessionLocal, engine
+
+WRITE_BATCH_MAX = int(os.getenv("WRITE_BATCH_MAX", "64"))
+
+
+def write_queue_enabled():
+    """On by default for SQLite (one writer anyway), opt-in elsewhere"""
+    default = "true" if engine.dialect.name == "sqlite" else "false"
+    return os.getenv("WRITE_QUEUE_ENABLED", default).lower() in ("1", "true", "yes")
+
+
+def run_job(job, session_factory=SessionLocal):
+    """Run one write job in its own session and transaction"""
+    db = session_factory()
+    try:
+        result = job(db)
+        db.commit()
+        return result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+class WriteQueue:
+    def __init__(self, session_factory=SessionLocal, max_batch=WRITE_BATCH_MAX):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.jobs = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.jobs_done = 0
+        self.fallbacks = 0
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """Finish everything already queued, then stop the writer thread"""
+        if self.thread is not None:
+            self.jobs.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def submit(self, job):
+        if self.thread is None:
+            raise RuntimeError("Write queue is not running")
+        future = Future()
+        self.jobs.put((job, future))
+        return future
+
+    async def run(self, job):
+        return await asyncio.wrap_future(self.submit(job))
+
+    def _run(self):
+        while True:
+            item = self.jobs.get()
+            if item is None:
+                return
+            batch = [item]
+            stopping = False
+            # Take whatever piled up while the last batch was committing, without waiting for more
+            while len(batch) < self.max_batch:
+                try:
+                    item = self.jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._execute(batch)
+            if stopping:
+                return
+
+    def _execute(self, batch):
+        db = self.session_factory()
+        try:
+            results = [job(db) for job, _ in batch]
+            db.commit()
+        except Exception:
+            db.rollback()
+            results = None
+        finally:
+            db.close()
+
+        if results is None:
+            # Retry one by one so only the job that failed sees its error
+            with self.lock:
+                self.fallbacks += 1
+            for job, future in batch:
+                try:
+                    future.set_result(run_job(job, self.session_factory))
+                except Exception as e:
+                    future.set_exception(e)
+        else:
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+        with self.lock:
+            self.batches += 1
+            self.jobs_done += len(batch)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "batches": self.batches,
+                "jobs": self.jobs_done,
+                "avg_batch_size": self.jobs_done / (self.batches or 1),
+                "fallbacks": self.fallbacks,
+            }
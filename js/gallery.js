@@ -93,9 +93,13 @@ function createGalleryCard(card) {
     cardDiv.classList.add('gallery-card');
     cardDiv.setAttribute('data-card-id', card.id);
 
+    // image is null when the checkpoint a seed-only card was shared with is no longer deployed
+    const imageSrc = card.image || 'assets/images/card-back.png';
+    const imageAlt = card.image ? 'Generated Card' : 'Card image unavailable';
+
     cardDiv.innerHTML = `
         <div class="card-image-wrapper">
-            <img src="${card.image}" alt="Generated Card" loading="lazy">
+            <img src="${imageSrc}" alt="${imageAlt}" loading="lazy">
         </div>
         <div class="card-upvote-section">
             <button class="upvote-btn" data-card-id="${card.id}" aria-label="Upvote card">
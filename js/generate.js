@@ -1,4 +1,6 @@
 let currentCardImageData = null; // Store current cards base64 data for sharing
+let currentCardSeed = null; // Seed the backend generated the current card from
+let currentCardModel = null; // Checkpoint that seed was rendered with
 
 async function generateCard() {
     const button = document.getElementById('generate-btn');
@@ -32,6 +34,8 @@ async function generateCard() {
 
         // Store the base64 image data (without the data:image/png;base64, prefix)
         currentCardImageData = data.image.replace('data:image/png;base64,', '');
+        currentCardSeed = data.seed;
+        currentCardModel = data.model;
 
         const cardDiv = document.createElement('div');
         cardDiv.classList.add('card', 'flip');
@@ -70,6 +74,8 @@ async function generateCard() {
             </div>
         `;
         currentCardImageData = null;
+        currentCardSeed = null;
+        currentCardModel = null;
     } finally {
         button.disabled = false;
         button.textContent = 'Generate New Card';
@@ -97,9 +103,10 @@ async function shareToGallery() {
             headers: {
                 'Content-Type': 'application/json'
             },
-            body: JSON.stringify({
-                image_data: currentCardImageData
-            })
+            // Cards with a seed are stored as (seed, model) and re-rendered by the backend, no image upload needed
+            body: JSON.stringify(currentCardSeed !== null && currentCardSeed !== undefined
+                ? { seed: currentCardSeed, model: currentCardModel }
+                : { image_data: currentCardImageData })
         });
 
         if (!response.ok) {
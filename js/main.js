@@ -66,13 +66,79 @@ function getRandomCard() {
   };
 }
 
-function generateDailyPack(packSize = 10) {
+/* 
+   Pre-generated card pool (built by backend/build_packs.py).
+   When the manifest is deployed, packs draw from the full pool using each
+   card's pre-assigned rarity; otherwise we fall back to cardImages above.
+*/
+const PACK_MANIFEST_URL = 'assets/packs/manifest.json';
+const PACK_ASSET_BASE = 'assets/packs/';
+let packPool = null;
+const atlasCache = {};
+
+async function loadPackPool() {
+  if (packPool !== null) return packPool;
+  try {
+    const response = await fetch(PACK_MANIFEST_URL);
+    if (!response.ok) throw new Error(`Manifest Error: ${response.status}`);
+    const manifest = await response.json();
+
+    // Group the pool by rarity tier so pack odds match the weights exactly
+    manifest.tiers = {};
+    manifest.cards.forEach(card => {
+      (manifest.tiers[card.rarity] = manifest.tiers[card.rarity] || []).push(card);
+    });
+    packPool = manifest;
+  } catch (error) {
+    packPool = false;
+  }
+  return packPool;
+}
+
+function loadAtlas(src) {
+  // Each sprite sheet is downloaded once and shared by every card on it
+  if (!atlasCache[src]) {
+    atlasCache[src] = new Promise((resolve, reject) => {
+      const img = new Image();
+      img.onload = () => resolve(img);
+      img.onerror = reject;
+      img.src = src;
+    });
+  }
+  return atlasCache[src];
+}
+
+async function getPoolCard(manifest) {
+  const rarity = getRandomRarity();
+  const card = getRandomElement(manifest.tiers[rarity] || manifest.cards);
+
+  if (card.file) {
+    return { image: PACK_ASSET_BASE + card.file, rarity: card.rarity };
+  }
+
+  // Cut the card out of its atlas so the rest of the page can keep using <img src>
+  const atlas = await loadAtlas(PACK_ASSET_BASE + manifest.atlases[card.atlas]);
+  const canvas = document.createElement('canvas');
+  canvas.width = manifest.card_width;
+  canvas.height = manifest.card_height;
+  canvas.getContext('2d').drawImage(
+    atlas, card.x, card.y, canvas.width, canvas.height, 0, 0, canvas.width, canvas.height
+  );
+  return { image: canvas.toDataURL('image/webp'), rarity: card.rarity };
+}
+
+async function generateDailyPack(packSize = 10) {
   const packContainer = document.querySelector('.card-container');
   if (!packContainer) return;
+
+  const manifest = await loadPackPool();
+  const packCards = await Promise.all(
+    Array.from({ length: packSize }, () => manifest ? getPoolCard(manifest) : getRandomCard())
+  );
   packContainer.innerHTML = '';
 
   for (let i = 0; i < packSize; i++) {
-    const cardData = getRandomCard();
+    const cardData = packCards[i];
     const cardDiv = document.createElement('div');
     cardDiv.classList.add('card');
     cardDiv.setAttribute('data-rarity', cardData.rarity.toLowerCase());